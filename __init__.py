@@ -9,15 +9,13 @@ import asyncio
 import logging
 from typing import Dict, List, Optional
 
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
 from src.market_data.collector import MarketDataCollector
 from src.market_data.analyzer import PriceAnalyzer
-from src.config.config import MIN_PROFIT_THRESHOLD
+from src.market_data.multicall import MulticallQuoteManager
+from src.config.config import ENABLED_NETWORKS, MIN_PROFIT_THRESHOLD
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("market_data")
 
 class MarketDataService:
@@ -28,7 +26,12 @@ class MarketDataService:
     def __init__(self):
         """Initialize the market data service."""
         self.collector = MarketDataCollector()
-        self.analyzer = PriceAnalyzer(self.collector)
+        # Pool reserves are re-read on-chain in one Multicall3 call per network before each analysis
+        web3_clients = {
+            network_id: AsyncWeb3(AsyncHTTPProvider(network.rpc_url, request_kwargs={"timeout": 10}))
+            for network_id, network in ENABLED_NETWORKS.items()
+        }
+        self.analyzer = PriceAnalyzer(self.collector, MulticallQuoteManager(web3_clients))
         self.running = False
         self.update_interval = 60  # seconds
     
@@ -48,12 +51,22 @@ class MarketDataService:
                 # Wait for the next update
                 await asyncio.sleep(self.update_interval)
             except Exception as e:
-                logger.error(f"Error in market data service: {e}")
+                logger.error("Error in market data service: %s", e)
                 await asyncio.sleep(5)  # Wait a bit before retrying
     
+    async def share_session(self, session) -> bool:
+        """
+        Make the analyzer's RPC clients use a shared aiohttp session.
+        
+        Returns:
+            bool: False if a client already had another session cached.
+        """
+        return await self.analyzer.quote_manager.share_session(session)
+    
     async def stop(self):
         """Stop the market data service."""
         self.running = False
+        self.analyzer.close()
         logger.info("Stopping market data service")
     
     def get_token_price(self, token_id: str) -> Optional[float]:
@@ -131,4 +144,8 @@ async def main():
             pass
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     asyncio.run(main())
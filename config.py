@@ -2,6 +2,8 @@
 Configuration settings for the DeFi Arbitrage Trading System.
 """
 import os
+from dataclasses import dataclass
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -12,9 +14,19 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 MIN_PROFIT_THRESHOLD = float(os.getenv("MIN_PROFIT_THRESHOLD", "0.005"))  # 0.5%
 MIN_LIQUIDITY_THRESHOLD = float(os.getenv("MIN_LIQUIDITY_THRESHOLD", "100000"))  # $100k
+MIN_POOL_LIQUIDITY = float(os.getenv("MIN_POOL_LIQUIDITY", "10000"))  # $10k, pools below this are ignored for pricing
+
+@dataclass(frozen=True, slots=True)
+class NetworkConfig:
+    """Settings of a blockchain network, parsed once at import."""
+    name: str
+    chain_id: int
+    rpc_url: str
+    explorer_url: str
+    enabled: bool
 
 # Blockchain networks
-NETWORKS = {
+_NETWORK_SETTINGS = {
     "polygon": {
         "name": "Polygon",
         "chain_id": 137,
@@ -59,6 +71,15 @@ NETWORKS = {
     },
 }
 
+NETWORKS = MappingProxyType({
+    network_id: NetworkConfig(**settings) for network_id, settings in _NETWORK_SETTINGS.items()
+})
+
+# Networks that are enabled and have an RPC endpoint configured
+ENABLED_NETWORKS = MappingProxyType({
+    network_id: network for network_id, network in NETWORKS.items() if network.enabled and network.rpc_url
+})
+
 # DEX configurations
 DEXES = {
     "uniswap": {
@@ -111,6 +132,8 @@ API_KEYS = {
     "coinmarketcap": os.getenv("COINMARKETCAP_API_KEY", ""),
     "the_graph": os.getenv("THE_GRAPH_API_KEY", ""),
 }
+# Seconds between ETH price requests, slow enough for CoinGecko's free and demo rate limits
+ETH_PRICE_REFRESH_INTERVAL = float(os.getenv("ETH_PRICE_REFRESH_INTERVAL", "60"))
 
 # Flash loan providers
 FLASH_LOAN_PROVIDERS = {
@@ -156,6 +179,7 @@ WALLET_CONFIG = {
         "sonic": int(os.getenv("SONIC_MAX_GAS_PRICE", "5")),  # gwei
     },
     "max_trade_size": float(os.getenv("MAX_TRADE_SIZE", "100000")),  # $100k
+    "max_concurrent_executions": int(os.getenv("MAX_CONCURRENT_EXECUTIONS", "16")),
 }
 
 # Coinbase onchain agent SDK settings
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 # db_config.py
+import asyncio
+import csv
+import io
 import psycopg2
 import logging
-import json
+import threading
+import weakref
+from contextlib import contextmanager
 from psycopg2 import sql
 from psycopg2.extras import Json
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+import orjson
 
 logger = logging.getLogger("db_config")
 
@@ -15,25 +22,72 @@ DB_NAME = "arbitrage_db"
 DB_USER = "arbitrage_user"
 DB_PASSWORD = "arbitrage_password"
 
+# Connection pool bounds; connections are reused instead of reconnecting per call
+DB_POOL_MINCONN = 2
+DB_POOL_MAXCONN = 20
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def _dumps(obj) -> str:
+    """Serializes a JSONB payload with orjson, which also accepts NumPy values."""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+def _get_pool():
+    """Returns the shared connection pool, creating it on first use."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadedConnectionPool(
+                    DB_POOL_MINCONN,
+                    DB_POOL_MAXCONN,
+                    host=DB_HOST,
+                    port=DB_PORT,
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASSWORD
+                )
+                logger.info(f"Successfully connected to database '{DB_NAME}' on {DB_HOST}:{DB_PORT}")
+    return _POOL
+
 def get_db_connection():
-    """Establishes a connection to the PostgreSQL database."""
+    """Checks out a connection to the PostgreSQL database from the pool.
+
+    Return it with put_db_connection(), or use pooled_conn() instead.
+    """
     try:
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD
-        )
-        logger.info(f"Successfully connected to database '{DB_NAME}' on {DB_HOST}:{DB_PORT}")
-        return conn
-    except psycopg2.OperationalError as e:
+        return _get_pool().getconn()
+    except (psycopg2.OperationalError, PoolError) as e:
         logger.error(f"Database connection failed: {e}")
         # Consider more robust error handling or fallback
         # Maybe try creating the database if it doesn't exist?
         # For now, just raise the exception
         raise
 
+def put_db_connection(conn, close: bool = False):
+    """Returns a connection checked out with get_db_connection() to the pool."""
+    _get_pool().putconn(conn, close=close)
+
+@contextmanager
+def pooled_conn():
+    """Context manager that checks out a pooled connection and always returns it."""
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        # The pool rolls back any transaction left open and discards broken connections
+        put_db_connection(conn)
+
+def close_db_pool():
+    """Closes every connection in the pool."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.closeall()
+            _POOL = None
+            logger.info("Database connection pool closed.")
+
 def init_db(conn):
     """Initializes the database schema if tables don't exist."""
     try:
@@ -70,6 +124,20 @@ def init_db(conn):
             """)
             logger.info("Checked/Created 'opportunities' table.")
 
+            # Unlogged staging table for bulk COPY ingest; rows are merged into opportunities periodically.
+            # It has no id column so staging doesn't draw from the opportunities id sequence, the merge
+            # assigns ids, but staged rows are still stamped on arrival.
+            cur.execute("""
+                CREATE UNLOGGED TABLE IF NOT EXISTS opportunities_staging (
+                    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                    opportunity_type VARCHAR(50),
+                    details JSONB,
+                    estimated_profit_usd DECIMAL,
+                    status VARCHAR(50) DEFAULT 'detected'
+                );
+            """)
+            logger.info("Checked/Created 'opportunities_staging' table.")
+
             # Add indexes for potentially faster lookups
             cur.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp);")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_trades_tx_hash ON trades(tx_hash);")
@@ -84,14 +152,46 @@ def init_db(conn):
         logger.error(f"Error initializing database schema: {e}")
         raise
 
+# Server-side prepared statements for the hot logging paths, parsed and planned once per connection
+_PREPARED_STATEMENTS = {
+    "log_trade_stmt": """
+        INSERT INTO trades (trade_type, dex_pair, token_pair, amount_in, amount_out, profit_usd, gas_cost_usd, tx_hash, status, details)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+        ON CONFLICT (tx_hash) DO NOTHING
+    """,
+    "log_opportunity_stmt": """
+        INSERT INTO opportunities (opportunity_type, details, estimated_profit_usd, status)
+        VALUES ($1, $2, $3, $4) RETURNING id
+    """,
+    "update_opportunity_status_stmt": "UPDATE opportunities SET status = $1 WHERE id = $2",
+}
+_prepared_conns = weakref.WeakSet()
+_prepared_conns_lock = threading.Lock()
+
+def _ensure_prepared(conn):
+    """Prepares the logging statements on a connection the first time it is used.
+
+    PREPARE isn't transactional, so the statements are left in the caller's
+    transaction rather than committed here. Any statements left over from an
+    earlier attempt that failed part way are deallocated first, so a retry on
+    the same connection doesn't fail with "already exists".
+    """
+    with _prepared_conns_lock:
+        if conn in _prepared_conns:
+            return
+    with conn.cursor() as cur:
+        cur.execute("DEALLOCATE ALL")
+        for name, statement in _PREPARED_STATEMENTS.items():
+            cur.execute(f"PREPARE {name} AS {statement}")
+    # A connection is only checked out to one thread at a time, so only the set needs the lock
+    with _prepared_conns_lock:
+        _prepared_conns.add(conn)
+
 def log_trade(conn, trade_data: dict):
     """Logs a completed trade to the database."""
-    sql_insert = sql.SQL("""
-        INSERT INTO trades (trade_type, dex_pair, token_pair, amount_in, amount_out, profit_usd, gas_cost_usd, tx_hash, status, details)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (tx_hash) DO NOTHING;
-    """)
+    sql_insert = sql.SQL("EXECUTE log_trade_stmt (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s);")
     try:
+        _ensure_prepared(conn)
         with conn.cursor() as cur:
             cur.execute(sql_insert, (
                 trade_data.get('trade_type'),
@@ -103,7 +203,7 @@ def log_trade(conn, trade_data: dict):
                 trade_data.get('gas_cost_usd'),
                 trade_data.get('tx_hash'),
                 trade_data.get('status'),
-                Json(trade_data.get('details', {}))
+                Json(trade_data.get('details', {}), dumps=_dumps)
             ))
         conn.commit()
         logger.debug(f"Logged trade {trade_data.get('tx_hash')}")
@@ -113,15 +213,13 @@ def log_trade(conn, trade_data: dict):
 
 def log_opportunity(conn, opportunity_data: dict):
     """Logs a detected arbitrage opportunity."""
-    sql_insert = sql.SQL("""
-        INSERT INTO opportunities (opportunity_type, details, estimated_profit_usd, status)
-        VALUES (%s, %s, %s, %s) RETURNING id;
-    """)
+    sql_insert = sql.SQL("EXECUTE log_opportunity_stmt (%s, %s, %s, %s);")
     try:
+        _ensure_prepared(conn)
         with conn.cursor() as cur:
             cur.execute(sql_insert, (
                 opportunity_data.get('opportunity_type'),
-                Json(opportunity_data.get('details', {})),
+                Json(opportunity_data.get('details', {}), dumps=_dumps),
                 opportunity_data.get('estimated_profit_usd'),
                 opportunity_data.get('status', 'detected')
             ))
@@ -136,8 +234,9 @@ def log_opportunity(conn, opportunity_data: dict):
 
 def update_opportunity_status(conn, opportunity_id: int, status: str):
     """Updates the status of an opportunity."""
-    sql_update = sql.SQL("UPDATE opportunities SET status = %s WHERE id = %s;")
+    sql_update = sql.SQL("EXECUTE update_opportunity_status_stmt (%s, %s);")
     try:
+        _ensure_prepared(conn)
         with conn.cursor() as cur:
             cur.execute(sql_update, (status, opportunity_id))
         conn.commit()
@@ -146,22 +245,215 @@ def update_opportunity_status(conn, opportunity_id: int, status: str):
         conn.rollback()
         logger.error(f"Error updating opportunity {opportunity_id} status: {e}")
 
+def _opportunity_row(opportunity_data: dict) -> tuple:
+    """Converts an opportunity to a staging table row, serializing its details."""
+    return (
+        opportunity_data.get('opportunity_type'),
+        _dumps(opportunity_data.get('details', {})),
+        opportunity_data.get('estimated_profit_usd'),
+        opportunity_data.get('status', 'detected')
+    )
+
+def _stage_rows(conn, rows) -> bool:
+    """COPYs opportunity rows into the staging table, returning whether they were written."""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(
+                "COPY opportunities_staging (opportunity_type, details, estimated_profit_usd, status) FROM STDIN WITH CSV",
+                buf
+            )
+        conn.commit()
+        logger.debug(f"Staged {len(rows)} opportunities")
+        return True
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Error staging {len(rows)} opportunities: {e}")
+        return False
+
+def bulk_log_opportunities(conn, opportunities: list) -> bool:
+    """Bulk-loads detected opportunities into the unlogged staging table with COPY.
+
+    Staged rows become visible in `opportunities` after merge_staged_opportunities().
+    """
+    return _stage_rows(conn, [_opportunity_row(opportunity_data) for opportunity_data in opportunities])
+
+def merge_staged_opportunities(conn) -> int:
+    """Moves staged opportunities into the opportunities table in one transaction."""
+    sql_merge = sql.SQL("""
+        WITH moved AS (
+            DELETE FROM opportunities_staging
+            RETURNING timestamp, opportunity_type, details, estimated_profit_usd, status
+        )
+        INSERT INTO opportunities (timestamp, opportunity_type, details, estimated_profit_usd, status)
+        SELECT timestamp, opportunity_type, details, estimated_profit_usd, status FROM moved;
+    """)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql_merge)
+            merged = cur.rowcount
+        conn.commit()
+        logger.debug(f"Merged {merged} staged opportunities")
+        return merged
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Error merging staged opportunities: {e}")
+        return 0
+
+def _merge_pooled(pool=None) -> int:
+    """Runs merge_staged_opportunities() on a connection from `pool`, or the shared pool."""
+    pool = pool or _get_pool()
+    conn = pool.getconn()
+    try:
+        return merge_staged_opportunities(conn)
+    finally:
+        pool.putconn(conn)
+
+async def run_staging_merge(interval: float = 5.0, pool=None):
+    """Periodically merges staged opportunities until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(_merge_pooled, pool)
+        except Exception as e:
+            # Staged rows stay put and are picked up by the next merge
+            logger.error(f"Error checking out a connection for the staging merge: {e}")
+
+
+# Queued by BatchedOpportunityLogger.stop() to wake its flush task
+_STOP = object()
+
+
+class BatchedOpportunityLogger:
+    """Buffers detected opportunities and writes them in batches.
+
+    Rows are queued without blocking the caller. A background task COPYs them
+    into the staging table, once `flush_every` rows are buffered or
+    `flush_interval` seconds have passed, and another merges the staging table
+    into `opportunities` every `merge_interval` seconds. A batch that fails is
+    retried, and while it is retried at most `max_pending` more rows are kept
+    queued, the oldest being dropped first.
+    """
+
+    def __init__(self, pool=None, flush_every: int = 200, flush_interval: float = 1.0,
+                 merge_interval: float = 5.0, max_pending: int = 100000):
+        self.pool = pool
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.merge_interval = merge_interval
+        self.max_pending = max_pending
+        self._queue = asyncio.Queue()
+        self._pending = []
+        self._dropped = 0
+        self._stopping = False
+        self._task = None
+        self._merge_task = None
+
+    def start(self):
+        """Starts the background flush and merge tasks on the running event loop."""
+        self._stopping = False
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self._merge_task is None:
+            self._merge_task = asyncio.create_task(run_staging_merge(self.merge_interval, self.pool))
+
+    async def stop(self):
+        """Stops the background tasks and writes and merges any rows still buffered."""
+        if self._merge_task is not None:
+            self._merge_task.cancel()
+            try:
+                await self._merge_task
+            except asyncio.CancelledError:
+                pass
+            self._merge_task = None
+        if self._task is not None:
+            # The flush task is never cancelled, a COPY already handed to a worker thread would still
+            # commit and its rows would be written again below. It finishes its batch and returns.
+            self._stopping = True
+            self._queue.put_nowait(_STOP)
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Opportunity flush task failed: {e}")
+            self._task = None
+        while not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not _STOP:
+                self._pending.append(row)
+        if self._pending:
+            rows, self._pending = self._pending, []
+            if not await asyncio.to_thread(self._flush, rows):
+                logger.error(f"Dropping {len(rows)} opportunities that could not be written on shutdown")
+        try:
+            await asyncio.to_thread(_merge_pooled, self.pool)
+        except Exception as e:
+            logger.error(f"Error merging staged opportunities on shutdown: {e}")
+
+    def log_opportunity(self, opportunity_data: dict):
+        """Queues an opportunity for the next batch, dropping the oldest queued one if the queue is full."""
+        if self._queue.qsize() >= self.max_pending:
+            self._queue.get_nowait()
+            self._dropped += 1
+        self._queue.put_nowait(_opportunity_row(opportunity_data))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            if not self._pending:
+                row = await self._queue.get()
+                if row is _STOP:
+                    break
+                self._pending.append(row)
+            deadline = loop.time() + self.flush_interval
+            while len(self._pending) < self.flush_every:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    break
+                self._pending.append(row)
+            # Rows stay pending until written, so a failed flush doesn't lose them
+            rows = list(self._pending)
+            written = await asyncio.to_thread(self._flush, rows)
+            if self._dropped:
+                logger.warning(f"Dropped {self._dropped} oldest queued opportunities, the queue was full")
+                self._dropped = 0
+            if written:
+                del self._pending[:len(rows)]
+            elif not self._stopping:
+                # Retry the batch on the next flush
+                await asyncio.sleep(self.flush_interval)
+
+    def _flush(self, rows) -> bool:
+        """Stages a batch of rows, returning whether it was written."""
+        pool = conn = None
+        try:
+            pool = self.pool or _get_pool()
+            conn = pool.getconn()
+            return _stage_rows(conn, rows)
+        except Exception as e:
+            logger.error(f"Error checking out a connection for {len(rows)} opportunities: {e}")
+            return False
+        finally:
+            if conn is not None:
+                pool.putconn(conn)
+
 
 # Example of running initialization directly
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     logger.info("Running DB initialization directly...")
-    connection = None
     try:
-        connection = get_db_connection()
-        if connection:
+        with pooled_conn() as connection:
             init_db(connection)
             logger.info("Database initialization script finished.")
-        else:
-            logger.error("Failed to get database connection.")
     except Exception as e:
         logger.error(f"An error occurred during direct DB initialization: {e}")
     finally:
-        if connection:
-            connection.close()
-            logger.info("Database connection closed.")
\ No newline at end of file
+        close_db_pool()
\ No newline at end of file
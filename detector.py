@@ -7,53 +7,203 @@ arbitrage opportunities across DEXs and blockchain networks.
 
 import logging
 import asyncio
+import heapq
+import math
 import time
-from typing import Dict, List, Optional, Tuple, Any
-import json
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Dict, List, Optional, Set, Tuple, Any
 import os
 
+import numpy as np
+from numba import njit
+
+from db_config import BatchedOpportunityLogger
 from src.market_data import MarketDataService
 from src.config.config import MIN_PROFIT_THRESHOLD, MIN_LIQUIDITY_THRESHOLD
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("arbitrage_detection")
 
+# Approximate block times used to estimate how long an opportunity takes to execute
+NETWORK_BLOCK_TIME_MS = {
+    "polygon": 2000,
+    "base": 2000,
+    "optimism": 2000,
+    "bsc": 3000,
+    "arbitrum": 250,
+    "sonic": 1000,
+}
+DEFAULT_BLOCK_TIME_MS = 12000
+
+# Largest trade as a fraction of the shallowest pool
+MAX_TRADE_PCT_CROSS_DEX = 0.05
+MAX_TRADE_PCT_TRIANGULAR = 0.03
+
+# Base risk scores (triangular is lower, it stays on one network), the risk added per unit
+# of profit (e.g. 1% profit adds 10 / 12) and the risk added by cross-network trades
+BASE_RISK_CROSS_DEX = 50.0
+BASE_RISK_TRIANGULAR = 40.0
+PROFIT_RISK_CROSS_DEX = 1000.0
+PROFIT_RISK_TRIANGULAR = 1200.0
+CROSS_NETWORK_RISK = 15.0
+
+# Liquidity tier bounds ($100k, $500k, $1M) and the risk added below each of them
+LIQUIDITY_TIERS = np.array([100000.0, 500000.0, 1000000.0])
+LIQUIDITY_RISK_CROSS_DEX = np.array([20.0, 10.0, 5.0, 0.0])
+LIQUIDITY_RISK_TRIANGULAR = np.array([25.0, 15.0, 8.0, 0.0])
+
+# Validation details that only depend on the validation cache key, the timestamp and token prices
+# are left out of cached verdicts and restamped on every hit
+VERDICT_FIELDS = (
+    "is_valid", "validation_message", "expected_profit_usd", "max_trade_size_usd",
+    "optimal_trade_size_usd", "estimated_execution_time_ms", "risk_score",
+    "buy_liquidity_usd", "sell_liquidity_usd",
+    "liquidity_a_to_b", "liquidity_b_to_c", "liquidity_c_to_a",
+)
+
+
+# The sizing and scoring kernels are compiled eagerly for float64 inputs, so the first
+# detection cycle does not pay the JIT warmup; later processes load Numba's on-disk cache
+@njit("float64(float64, float64, float64)", cache=True, nogil=True)
+def _optimal_trade_size(reserve, fee, price_gap):
+    """Closed-form profit-maximizing trade size against a constant-product pool."""
+    return max(0.0, reserve * (math.sqrt((1.0 + price_gap) * (1.0 - fee)) - 1.0) / (1.0 - fee))
+
+
+@njit("float64(float64, float64, float64, float64, float64[::1], float64)", cache=True, nogil=True)
+def _risk_score(base_risk, profit_weight, profit_pct, min_liquidity, liquidity_risk, extra_risk):
+    """Risk score capped to 0-100, from the profit, the liquidity tier of the shallowest pool and any extra risk."""
+    tier = np.searchsorted(LIQUIDITY_TIERS, min_liquidity, side="right")
+    score = base_risk + profit_pct * profit_weight + liquidity_risk[tier] + extra_risk
+    return max(0.0, min(100.0, score))
+
+
+@njit(
+    "Tuple((float64[::1], float64[::1], float64[::1]))(float64[::1], float64[::1], float64[::1],"
+    " float64[::1], float64[::1], float64, float64, float64, float64[::1])",
+    cache=True, nogil=True
+)
+def score_opportunities(min_liquidity, fee, price_gap, profit_pct, extra_risk,
+                        cap_pct, base_risk, profit_weight, liquidity_risk):
+    """
+    Size and score a batch of opportunities.
+    
+    The optimal size of each opportunity is taken against half of the liquidity of its
+    shallowest pool (the input-side reserve) and capped at `cap_pct` of that pool.
+    
+    Returns:
+        The maximum trade sizes, optimal trade sizes and risk scores, one per opportunity.
+    """
+    n = min_liquidity.shape[0]
+    max_trade_size = np.empty(n)
+    optimal_trade_size = np.empty(n)
+    risk = np.empty(n)
+    
+    for i in range(n):
+        max_trade_size[i] = min_liquidity[i] * cap_pct
+        optimal_trade_size[i] = min(
+            _optimal_trade_size(min_liquidity[i] / 2, fee[i], price_gap[i]), max_trade_size[i]
+        )
+        risk[i] = _risk_score(base_risk, profit_weight, profit_pct[i], min_liquidity[i], liquidity_risk, extra_risk[i])
+    
+    return max_trade_size, optimal_trade_size, risk
+
+
 class ArbitrageDetector:
     """
     Detects and validates arbitrage opportunities across DEXs and networks.
     """
     
-    def __init__(self, market_data_service: MarketDataService):
-        """Initialize the arbitrage detector with a market data service."""
+    # Validation details of an opportunity before it is validated
+    _VALIDATION_DEFAULTS = (
+        ("is_valid", False),
+        ("validation_message", ""),
+        ("expected_profit_usd", 0),
+        ("max_trade_size_usd", 0),
+        ("optimal_trade_size_usd", 0),
+        ("estimated_execution_time_ms", 0),
+        ("risk_score", 0),  # 0-100, higher is riskier
+    )
+    
+    def __init__(self, market_data_service: MarketDataService,
+                 opportunity_logger: Optional[BatchedOpportunityLogger] = None):
+        """
+        Initialize the arbitrage detector with a market data service.
+        
+        Args:
+            market_data_service: Source of market data to detect opportunities in.
+            opportunity_logger: Records every validated opportunity in the database, if given.
+        """
         self.market_data = market_data_service
+        self.opportunity_logger = opportunity_logger
         self.opportunities = []
         self.validated_opportunities = []
-        self.last_detection = 0
+        self.last_detection = float("-inf")  # monotonic time of the last detection
         self.detection_interval = 30  # seconds
         self.min_profit_threshold = MIN_PROFIT_THRESHOLD
         self.min_liquidity = MIN_LIQUIDITY_THRESHOLD
+        self.top_k = 50  # number of validated opportunities kept per detection
+        # (dex_id, network_id) -> (build time, pools keyed by ID), rebuilt once per detection interval
+        self._pool_index: Dict[Tuple[str, str], Tuple[float, Dict[str, Dict]]] = {}
+        # Token symbol -> USD price, cleared at the start of every detection cycle
+        self._price_cache: Dict[str, float] = {}
+        # Validator of each opportunity type
+        self._validators = {
+            "cross_dex": self.validate_cross_dex_opportunity,
+            "triangular": self.validate_triangular_opportunity,
+        }
+        self.max_concurrent_validations = 32
+        # Validation verdicts keyed by pool identity and bucketed market state, in LRU order
+        self._validation_cache: Dict[Tuple, Tuple[float, Optional[Dict]]] = OrderedDict()
+        self.validation_cache_size = 10000
+        self._validation_semaphore = asyncio.Semaphore(self.max_concurrent_validations)
     
     async def start_detection(self):
         """Start continuous arbitrage detection."""
         logger.info("Starting arbitrage detection")
         
-        while True:
-            try:
-                await self.detect_opportunities()
-                await asyncio.sleep(self.detection_interval)
-            except Exception as e:
-                logger.error(f"Error in arbitrage detection: {e}")
-                await asyncio.sleep(5)  # Wait a bit before retrying
+        # Cycles are scheduled on a fixed period from the start of the previous one, so a slow
+        # cycle doesn't push every later cycle back
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        
+        if self.opportunity_logger is not None:
+            self.opportunity_logger.start()
+        try:
+            while True:
+                try:
+                    # The schedule already keeps the interval, so the interval check is bypassed
+                    await self.detect_opportunities(force=True)
+                    next_run += self.detection_interval
+                except Exception as e:
+                    logger.error("Error in arbitrage detection: %s", e)
+                    next_run = loop.time() + 5  # Wait a bit before retrying
+                
+                delay = next_run - loop.time()
+                if delay < 0:
+                    logger.warning("Detection is falling behind schedule by %.2fs", -delay)
+                    next_run = loop.time()
+                    delay = 0
+                await asyncio.sleep(delay)
+        finally:
+            # Write out whatever is still buffered when detection is cancelled
+            if self.opportunity_logger is not None:
+                await self.opportunity_logger.stop()
     
-    async def detect_opportunities(self):
-        """Detect arbitrage opportunities using market data."""
-        current_time = time.time()
-        if current_time - self.last_detection < self.detection_interval:
-            logger.debug("Skipping detection, not enough time has passed since last detection")
+    async def detect_opportunities(self, force: bool = False):
+        """
+        Detect arbitrage opportunities using market data.
+        
+        Args:
+            force: Run even if the detection interval hasn't elapsed since the last detection.
+        """
+        # Interval gating uses the event loop's monotonic clock, the same one the detection loop
+        # schedules on, so wall clock adjustments can't skip or repeat a cycle
+        current_time = asyncio.get_running_loop().time()
+        if not force and current_time - self.last_detection < self.detection_interval:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Skipping detection, not enough time has passed since last detection: %.1fs",
+                             current_time - self.last_detection)
             return
         
         try:
@@ -66,75 +216,358 @@ class ArbitrageDetector:
             self.opportunities = raw_opportunities
             
             # Validate and prioritize opportunities
-            await self.validate_opportunities()
+            await self.validate_opportunities(time.time())
             
             self.last_detection = current_time
-            logger.info(f"Detected {len(self.opportunities)} opportunities, "
-                       f"{len(self.validated_opportunities)} validated")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Detected %d opportunities, %d validated",
+                            len(self.opportunities), len(self.validated_opportunities))
         except Exception as e:
-            logger.error(f"Error detecting arbitrage opportunities: {e}")
+            logger.error("Error detecting arbitrage opportunities: %s", e)
     
-    async def validate_opportunities(self):
-        """Validate arbitrage opportunities by checking additional constraints."""
+    async def validate_opportunities(self, validation_timestamp: Optional[float] = None):
+        """
+        Validate arbitrage opportunities by checking additional constraints.
+        
+        Args:
+            validation_timestamp: Wall clock time stamped on every validated
+                opportunity, defaults to the current time.
+        """
+        if validation_timestamp is None:
+            validation_timestamp = time.time()
         validated = []
         
+        # Token prices are looked up at most once per token per cycle
+        self._price_cache.clear()
+        
+        # Build the pool index of every DEX/network pair once, before the per-opportunity lookups
+        for dex_id, network_id in self._pool_keys(self.opportunities):
+            self._get_pool_index(dex_id, network_id)
+        
+        now = time.monotonic()
+        ttl = 2 * self.detection_interval
+        self._evict_validation_cache(now - ttl)
+        
+        # Drop unprofitable opportunities up front, reuse the result of those whose pools and profit
+        # haven't moved since a recent cycle, and split the rest by type so each group is validated
+        # as one batch of array operations
+        batches = {"cross_dex": ([], []), "triangular": ([], [])}
+        from_cache: Set[int] = set()  # ids of the validated dicts rebuilt from cached verdicts
         for opp in self.opportunities:
-            try:
-                # Apply additional validation logic
-                is_valid, validation_details = await self.validate_opportunity(opp)
-                
-                if is_valid:
-                    # Add validation details to the opportunity
-                    validated_opp = {**opp, **validation_details}
+            batch = batches.get(opp.get("type"))
+            if batch is None or self._below_min_profit(opp):
+                continue
+            
+            key = self._validation_cache_key(opp)
+            cached = self._validation_cache.get(key)
+            if cached is not None and now - cached[0] < ttl:
+                self._validation_cache.move_to_end(key)
+                if cached[1] is not None:
+                    validated_opp = self._restamp(opp, cached[1], validation_timestamp)
+                    from_cache.add(id(validated_opp))
                     validated.append(validated_opp)
+                continue
+            
+            batch[0].append(opp)
+            batch[1].append(key)
+        
+        for (batch, keys), validate_batch in ((batches["cross_dex"], self._validate_batch_cross_dex),
+                                              (batches["triangular"], self._validate_batch_triangular)):
+            try:
+                results = validate_batch(batch, validation_timestamp)
             except Exception as e:
-                logger.error(f"Error validating opportunity: {e}")
+                # A malformed opportunity fails the whole batch, validate one by one to isolate it
+                logger.error("Error validating opportunity batch: %s", e)
+                validated.extend(await self._validate_each(batch, validation_timestamp))
+                continue
+            
+            for key, result in zip(keys, results):
+                self._validation_cache[key] = (
+                    now, None if result is None else {field: result[field] for field in VERDICT_FIELDS if field in result}
+                )
+                if result is not None:
+                    validated.append(result)
+        
+        # Bound the cache to the most recently used entries
+        while len(self._validation_cache) > self.validation_cache_size:
+            self._validation_cache.popitem(last=False)
+        
+        # Keep the most profitable opportunities, ordered by expected profit
+        self.validated_opportunities = heapq.nlargest(
+            self.top_k, validated, key=itemgetter("expected_profit_usd")
+        )
+        
+        # Cached verdicts were logged by the cycle that computed them, only fresh validations are recorded
+        if self.opportunity_logger is not None:
+            for opp in self.validated_opportunities:
+                if id(opp) in from_cache:
+                    continue
+                self.opportunity_logger.log_opportunity({
+                    "opportunity_type": opp.get("type"),
+                    "details": opp,
+                    "estimated_profit_usd": opp.get("expected_profit_usd"),
+                })
+    
+    def _below_min_profit(self, opportunity: Dict) -> bool:
+        """Check whether an opportunity's profit after fees is below the threshold, without any lookup."""
+        if opportunity.get("type") == "triangular":
+            profit_pct = opportunity.get("round_trip_rate", 1) - 1 - opportunity.get("total_fee", 0)
+        else:
+            profit_pct = opportunity.get("net_profit_pct", 0)
+        return profit_pct < self.min_profit_threshold
+    
+    def _validation_cache_key(self, opportunity: Dict) -> Tuple:
+        """
+        Build the validation cache key of an opportunity.
+        
+        The key identifies the pools involved together with their liquidity rounded to
+        $1k and the profit rounded to 5 decimals, so it only changes when the market moves.
+        """
+        if opportunity.get("type") == "cross_dex":
+            buy_pool = self.get_pool_details(
+                opportunity.get("buy_dex"), opportunity.get("buy_network"), opportunity.get("buy_pool")
+            )
+            sell_pool = self.get_pool_details(
+                opportunity.get("sell_dex"), opportunity.get("sell_network"), opportunity.get("sell_pool")
+            )
+            return (
+                opportunity.get("buy_pool"),
+                opportunity.get("sell_pool"),
+                round(float(buy_pool.get("reserveUSD", 0)), -3),
+                round(float(sell_pool.get("reserveUSD", 0)), -3),
+                round(opportunity.get("net_profit_pct", 0), 5)
+            )
+        
+        legs = (opportunity.get("pool_a_to_b"), opportunity.get("pool_b_to_c"), opportunity.get("pool_c_to_a"))
+        liquidity = tuple(
+            round(float(self.get_pool_details(
+                opportunity.get("dex_id"), opportunity.get("network_id"), pool_id
+            ).get("reserveUSD", 0)), -3)
+            for pool_id in legs
+        )
+        return (*legs, *liquidity, round(opportunity.get("round_trip_rate", 0), 5))
+    
+    def _restamp(self, opportunity: Dict, verdict: Dict, validation_timestamp: float) -> Dict:
+        """Rebuild a validated opportunity from a cached verdict, with the current time and token prices."""
+        validated_opp = opportunity.copy()
+        validated_opp.update(verdict)
+        validated_opp["validation_timestamp"] = validation_timestamp
+        if opportunity.get("type") == "cross_dex":
+            validated_opp["token0_price_usd"] = self._get_token_price(opportunity["token0"])
+            validated_opp["token1_price_usd"] = self._get_token_price(opportunity["token1"])
+        return validated_opp
+    
+    def _evict_validation_cache(self, cutoff: float):
+        """Drop cached validation results computed before the cutoff time."""
+        stale = [key for key, (timestamp, _) in self._validation_cache.items() if timestamp < cutoff]
+        for key in stale:
+            del self._validation_cache[key]
+    
+    async def _validate_each(self, opportunities: List[Dict], validation_timestamp: float) -> List[Dict]:
+        """Validate opportunities individually and concurrently, skipping those that fail."""
+        # validate_opportunity reports its own errors as invalid results, so nothing here can raise
+        results = await asyncio.gather(
+            *(self.validate_opportunity(opp, validation_timestamp) for opp in opportunities)
+        )
+        
+        validated = []
+        for opp, (is_valid, validation_details) in zip(opportunities, results):
+            if is_valid:
+                # Add validation details to the opportunity
+                validated_opp = opp.copy()
+                validated_opp.update(validation_details)
+                validated.append(validated_opp)
+        
+        return validated
+    
+    def _validate_batch_cross_dex(self, opportunities: List[Dict],
+                                  validation_timestamp: float) -> List[Optional[Dict]]:
+        """
+        Validate cross-DEX opportunities as a batch.
         
-        # Sort validated opportunities by expected profit
-        validated.sort(key=lambda x: x.get("expected_profit_usd", 0), reverse=True)
+        Sizes, expected profits and risk scores are computed over NumPy arrays with
+        one entry per opportunity, and only the opportunities that pass the liquidity
+        check are materialized as validated dicts.
+        
+        Returns:
+            List[Optional[Dict]]: Per opportunity, the opportunity merged with its
+                validation details, or None if it was rejected.
+        """
+        n = len(opportunities)
+        if n == 0:
+            return []
+        
+        buy_pools = [
+            self.get_pool_details(opp["buy_dex"], opp["buy_network"], opp["buy_pool"])
+            for opp in opportunities
+        ]
+        sell_pools = [
+            self.get_pool_details(opp["sell_dex"], opp["sell_network"], opp["sell_pool"])
+            for opp in opportunities
+        ]
+        
+        buy_liquidity = np.fromiter(
+            (float(pool.get("reserveUSD", 0)) if pool else 0.0 for pool in buy_pools), dtype=np.float64, count=n
+        )
+        sell_liquidity = np.fromiter(
+            (float(pool.get("reserveUSD", 0)) if pool else 0.0 for pool in sell_pools), dtype=np.float64, count=n
+        )
+        profit_pct = np.fromiter((opp["net_profit_pct"] for opp in opportunities), dtype=np.float64, count=n)
+        fee = np.fromiter(
+            (opp.get("buy_fee", 0) + opp.get("sell_fee", 0) for opp in opportunities), dtype=np.float64, count=n
+        )
+        price_gap = np.fromiter(
+            (opp.get("price_diff_pct", opp["net_profit_pct"] + opp.get("buy_fee", 0) + opp.get("sell_fee", 0))
+             for opp in opportunities),
+            dtype=np.float64, count=n
+        )
+        # Cross-network trades add complexity and risk
+        network_risk = np.fromiter(
+            (CROSS_NETWORK_RISK if opp["buy_network"] != opp["sell_network"] else 0.0 for opp in opportunities),
+            dtype=np.float64, count=n
+        )
         
-        self.validated_opportunities = validated
+        min_liquidity = np.minimum(buy_liquidity, sell_liquidity)
+        
+        max_trade_size, optimal_trade_size, risk_score = score_opportunities(
+            min_liquidity, fee, price_gap, profit_pct, network_risk,
+            MAX_TRADE_PCT_CROSS_DEX, BASE_RISK_CROSS_DEX, PROFIT_RISK_CROSS_DEX, LIQUIDITY_RISK_CROSS_DEX
+        )
+        expected_profit = optimal_trade_size * profit_pct
+        
+        valid = np.flatnonzero(min_liquidity >= self.min_liquidity)
+        validated = [None] * n
+        if valid.size == 0:
+            return validated
+        
+        for i, max_size, optimal_size, profit_usd, risk, buy_liq, sell_liq in zip(
+            valid.tolist(),
+            max_trade_size[valid].tolist(),
+            optimal_trade_size[valid].tolist(),
+            expected_profit[valid].tolist(),
+            risk_score[valid].tolist(),
+            buy_liquidity[valid].tolist(),
+            sell_liquidity[valid].tolist()
+        ):
+            opp = opportunities[i]
+            validated[i] = {
+                **opp,
+                "validation_timestamp": validation_timestamp,
+                "is_valid": True,
+                "validation_message": "Opportunity validated successfully",
+                "expected_profit_usd": profit_usd,
+                "max_trade_size_usd": max_size,
+                "optimal_trade_size_usd": optimal_size,
+                "estimated_execution_time_ms": self.estimate_execution_time(opp["buy_network"], opp["sell_network"]),
+                "risk_score": risk,
+                "token0_price_usd": self._get_token_price(opp["token0"]),
+                "token1_price_usd": self._get_token_price(opp["token1"]),
+                "buy_liquidity_usd": buy_liq,
+                "sell_liquidity_usd": sell_liq
+            }
+        
+        return validated
     
-    async def validate_opportunity(self, opportunity: Dict) -> Tuple[bool, Dict]:
+    def _validate_batch_triangular(self, opportunities: List[Dict],
+                                   validation_timestamp: float) -> List[Optional[Dict]]:
+        """
+        Validate triangular opportunities as a batch.
+        
+        Returns:
+            List[Optional[Dict]]: Per opportunity, the opportunity merged with its
+                validation details, or None if it was rejected.
+        """
+        n = len(opportunities)
+        if n == 0:
+            return []
+        
+        liquidity = np.empty((3, n), dtype=np.float64)
+        for row, leg in enumerate(("pool_a_to_b", "pool_b_to_c", "pool_c_to_a")):
+            pools = (self.get_pool_details(opp["dex_id"], opp["network_id"], opp[leg]) for opp in opportunities)
+            liquidity[row] = np.fromiter(
+                (float(pool.get("reserveUSD", 0)) if pool else 0.0 for pool in pools), dtype=np.float64, count=n
+            )
+        gain_pct = np.fromiter((opp["round_trip_rate"] for opp in opportunities), dtype=np.float64, count=n) - 1
+        total_fee = np.fromiter((opp["total_fee"] for opp in opportunities), dtype=np.float64, count=n)
+        
+        min_liquidity = np.minimum.reduce(liquidity)
+        
+        max_trade_size, optimal_trade_size, risk_score = score_opportunities(
+            min_liquidity, total_fee, gain_pct, gain_pct, np.zeros(n),
+            MAX_TRADE_PCT_TRIANGULAR, BASE_RISK_TRIANGULAR, PROFIT_RISK_TRIANGULAR, LIQUIDITY_RISK_TRIANGULAR
+        )
+        expected_profit = optimal_trade_size * (gain_pct - total_fee)
+        
+        valid = np.flatnonzero(min_liquidity >= self.min_liquidity)
+        validated = [None] * n
+        if valid.size == 0:
+            return validated
+        
+        for i, max_size, optimal_size, profit_usd, risk, liq_ab, liq_bc, liq_ca in zip(
+            valid.tolist(),
+            max_trade_size[valid].tolist(),
+            optimal_trade_size[valid].tolist(),
+            expected_profit[valid].tolist(),
+            risk_score[valid].tolist(),
+            *liquidity[:, valid].tolist()
+        ):
+            opp = opportunities[i]
+            validated[i] = {
+                **opp,
+                "validation_timestamp": validation_timestamp,
+                "is_valid": True,
+                "validation_message": "Opportunity validated successfully",
+                "expected_profit_usd": profit_usd,
+                "max_trade_size_usd": max_size,
+                "optimal_trade_size_usd": optimal_size,
+                "estimated_execution_time_ms": self.estimate_execution_time_triangular(opp["network_id"]),
+                "risk_score": risk,
+                "liquidity_a_to_b": liq_ab,
+                "liquidity_b_to_c": liq_bc,
+                "liquidity_c_to_a": liq_ca
+            }
+        
+        return validated
+    
+    async def validate_opportunity(self, opportunity: Dict,
+                                   validation_timestamp: Optional[float] = None) -> Tuple[bool, Dict]:
         """
         Validate a single arbitrage opportunity.
         
+        Args:
+            opportunity: The opportunity to validate.
+            validation_timestamp: Wall clock time stamped on the validation details,
+                defaults to the current time.
+        
         Returns:
             Tuple[bool, Dict]: A tuple containing a boolean indicating if the opportunity
                 is valid, and a dictionary with additional validation details.
         """
-        validation_details = {
-            "validation_timestamp": time.time(),
-            "is_valid": False,
-            "validation_message": "",
-            "expected_profit_usd": 0,
-            "max_trade_size_usd": 0,
-            "optimal_trade_size_usd": 0,
-            "estimated_execution_time_ms": 0,
-            "risk_score": 0  # 0-100, higher is riskier
-        }
+        if validation_timestamp is None:
+            validation_timestamp = time.time()
+        validation_details = {"validation_timestamp": validation_timestamp}
+        validation_details.update(self._VALIDATION_DEFAULTS)
         
         try:
-            # Different validation logic based on opportunity type
-            if opportunity["type"] == "cross_dex":
-                return await self.validate_cross_dex_opportunity(opportunity, validation_details)
-            elif opportunity["type"] == "triangular":
-                return await self.validate_triangular_opportunity(opportunity, validation_details)
-            else:
-                validation_details["validation_message"] = f"Unknown opportunity type: {opportunity['type']}"
-                return False, validation_details
+            # Bound the number of validations in flight so concurrent callers don't flood the data sources
+            async with self._validation_semaphore:
+                # Different validation logic based on opportunity type
+                opportunity_type = opportunity["type"]
+                validator = self._validators.get(opportunity_type)
+                if validator is None:
+                    validation_details["validation_message"] = f"Unknown opportunity type: {opportunity_type}"
+                    return False, validation_details
+                return await validator(opportunity, validation_details)
         except Exception as e:
             validation_details["validation_message"] = f"Validation error: {str(e)}"
             return False, validation_details
     
     async def validate_cross_dex_opportunity(self, opportunity: Dict, validation_details: Dict) -> Tuple[bool, Dict]:
         """Validate a cross-DEX arbitrage opportunity."""
-        # Check if the tokens are supported
-        token0, token1 = opportunity["token0"], opportunity["token1"]
-        
-        # Get current token prices (in a real implementation, this would use actual token IDs)
-        token0_price = self.market_data.get_token_price(token0.lower()) or 1.0
-        token1_price = self.market_data.get_token_price(token1.lower()) or 1.0
+        # Reject unprofitable opportunities before any lookup
+        if self._below_min_profit(opportunity):
+            validation_details["validation_message"] = "Insufficient profit"
+            return False, validation_details
         
         # Check liquidity on both DEXs
         buy_pool = self.get_pool_details(
@@ -161,14 +594,22 @@ class ArbitrageDetector:
             validation_details["validation_message"] = "Insufficient liquidity"
             return False, validation_details
         
-        # Calculate maximum trade size (limited by the smaller pool)
-        max_trade_size_usd = min(buy_liquidity_usd, sell_liquidity_usd) * 0.05  # Limit to 5% of pool size
+        # Get current token prices (in a real implementation, this would use actual token IDs)
+        token0_price = self._get_token_price(opportunity["token0"])
+        token1_price = self._get_token_price(opportunity["token1"])
         
-        # Calculate optimal trade size based on price impact
-        optimal_trade_size_usd = self.calculate_optimal_trade_size(
-            buy_liquidity_usd, 
-            sell_liquidity_usd,
-            opportunity["net_profit_pct"]
+        # Calculate maximum trade size (limited by the smaller pool)
+        max_trade_size_usd = min(buy_liquidity_usd, sell_liquidity_usd) * MAX_TRADE_PCT_CROSS_DEX
+        
+        # Calculate optimal trade size against the input-side reserve of the smaller pool
+        fee = opportunity.get("buy_fee", 0) + opportunity.get("sell_fee", 0)
+        optimal_trade_size_usd = min(
+            self.calculate_optimal_trade_size(
+                min(buy_liquidity_usd, sell_liquidity_usd) / 2,
+                fee,
+                opportunity.get("price_diff_pct", opportunity["net_profit_pct"] + fee)
+            ),
+            max_trade_size_usd
         )
         
         # Calculate expected profit
@@ -207,6 +648,11 @@ class ArbitrageDetector:
     
     async def validate_triangular_opportunity(self, opportunity: Dict, validation_details: Dict) -> Tuple[bool, Dict]:
         """Validate a triangular arbitrage opportunity."""
+        # Reject unprofitable opportunities before any lookup
+        if self._below_min_profit(opportunity):
+            validation_details["validation_message"] = "Insufficient profit"
+            return False, validation_details
+        
         # Get pool details for each leg of the triangle
         pool_a_to_b = self.get_pool_details(
             opportunity["dex_id"], 
@@ -242,14 +688,15 @@ class ArbitrageDetector:
             return False, validation_details
         
         # Calculate maximum trade size (limited by the smallest pool)
-        max_trade_size_usd = min_liquidity * 0.03  # Limit to 3% of smallest pool size
+        max_trade_size_usd = min_liquidity * MAX_TRADE_PCT_TRIANGULAR
         
         # Calculate optimal trade size based on price impact
         optimal_trade_size_usd = self.calculate_optimal_trade_size_triangular(
             liquidity_a_to_b,
             liquidity_b_to_c,
             liquidity_c_to_a,
-            opportunity["round_trip_rate"] - 1  # Convert to percentage gain
+            opportunity["round_trip_rate"] - 1,  # Convert to percentage gain
+            opportunity["total_fee"]
         )
         
         # Calculate expected profit
@@ -286,16 +733,9 @@ class ArbitrageDetector:
     
     def get_pool_details(self, dex_id: str, network_id: str, pool_id: str) -> Optional[Dict]:
         """Get details for a specific liquidity pool."""
-        # In a real implementation, this would query the market data service
-        # For demonstration, we'll return placeholder data
-        
-        # Get pools for the specified DEX and network
-        pools = self.market_data.get_liquidity_pools(dex_id, network_id)
-        
-        # Find the pool with the matching ID
-        for pool in pools:
-            if pool.get("id") == pool_id:
-                return pool
+        pool = self._get_pool_index(dex_id, network_id).get(pool_id)
+        if pool is not None:
+            return pool
         
         # If pool not found, return placeholder data
         return {
@@ -304,77 +744,108 @@ class ArbitrageDetector:
             "volumeUSD24h": 1000000  # $1M daily volume
         }
     
-    def calculate_optimal_trade_size(self, buy_liquidity: float, sell_liquidity: float, profit_pct: float) -> float:
-        """Calculate the optimal trade size based on liquidity and expected profit."""
-        # A simple model: optimal size increases with liquidity and profit percentage
-        # In a real implementation, this would use a more sophisticated model
-        
-        # Base size: 0.5% of the smaller liquidity pool
-        base_size = min(buy_liquidity, sell_liquidity) * 0.005
-        
-        # Adjust based on profit percentage (higher profit allows larger trades)
-        profit_multiplier = 1 + (profit_pct * 10)  # e.g., 1% profit gives 1.1x multiplier
+    def _get_pool_index(self, dex_id: str, network_id: str) -> Dict[str, Dict]:
+        """Get the pools of a DEX on a network keyed by pool ID, refetching them once per detection interval."""
+        key = (dex_id, network_id)
+        now = time.monotonic()
+        
+        cached = self._pool_index.get(key)
+        if cached is not None and now - cached[0] < self.detection_interval:
+            return cached[1]
+        
+        pools = self.market_data.get_liquidity_pools(dex_id, network_id) or []
+        index = {pool.get("id"): pool for pool in pools}
+        self._pool_index[key] = (now, index)
+        return index
+    
+    def _get_token_price(self, token: str) -> float:
+        """Get the USD price of a token, cached for the current detection cycle."""
+        price = self._price_cache.get(token)
+        if price is None:
+            price = self.market_data.get_token_price(token.lower()) or 1.0
+            self._price_cache[token] = price
+        return price
+    
+    @staticmethod
+    def _pool_keys(opportunities: List[Dict]) -> Set[Tuple[str, str]]:
+        """Collect the distinct (dex_id, network_id) pairs referenced by a list of opportunities."""
+        keys = set()
+        for opp in opportunities:
+            if opp.get("type") == "cross_dex":
+                keys.add((opp.get("buy_dex"), opp.get("buy_network")))
+                keys.add((opp.get("sell_dex"), opp.get("sell_network")))
+            elif opp.get("type") == "triangular":
+                keys.add((opp.get("dex_id"), opp.get("network_id")))
+        keys.discard((None, None))
+        return keys
+    
+    def calculate_optimal_trade_size(self, reserve: float, fee: float, price_gap: float) -> float:
+        """
+        Calculate the profit-maximizing trade size against a constant-product pool.
         
-        # Cap at 5% of the smaller pool
-        max_size = min(buy_liquidity, sell_liquidity) * 0.05
+        Trading d into a pool with input-side reserve x, when the price elsewhere is
+        (1 + price_gap) times better and the route pays a fee f, is most profitable at
+        d = x * (sqrt((1 + price_gap) * (1 - f)) - 1) / (1 - f).
         
-        optimal_size = min(base_size * profit_multiplier, max_size)
+        Args:
+            reserve: Input-side reserve of the pool in USD.
+            fee: Total swap fee along the route, as a fraction.
+            price_gap: Relative price discrepancy being arbitraged, as a fraction.
         
-        return optimal_size
+        Returns:
+            float: The optimal trade size in USD, 0 when the gap does not cover the fee.
+        """
+        return _optimal_trade_size(reserve, fee, price_gap)
     
     def calculate_optimal_trade_size_triangular(self, liquidity_a_to_b: float, liquidity_b_to_c: float, 
-                                              liquidity_c_to_a: float, profit_pct: float) -> float:
+                                              liquidity_c_to_a: float, profit_pct: float,
+                                              total_fee: float = 0.0) -> float:
         """Calculate the optimal trade size for triangular arbitrage."""
-        # Base size: 0.3% of the smallest liquidity pool
-        base_size = min(liquidity_a_to_b, liquidity_b_to_c, liquidity_c_to_a) * 0.003
-        
-        # Adjust based on profit percentage
-        profit_multiplier = 1 + (profit_pct * 8)  # e.g., 1% profit gives 1.08x multiplier
-        
-        # Cap at 3% of the smallest pool
-        max_size = min(liquidity_a_to_b, liquidity_b_to_c, liquidity_c_to_a) * 0.03
-        
-        optimal_size = min(base_size * profit_multiplier, max_size)
+        # The shallowest leg bounds the whole route
+        min_liquidity = min(liquidity_a_to_b, liquidity_b_to_c, liquidity_c_to_a)
         
-        return optimal_size
+        # Cap at the largest trade the smallest pool allows
+        return min(
+            self.calculate_optimal_trade_size(min_liquidity / 2, total_fee, profit_pct),
+            min_liquidity * MAX_TRADE_PCT_TRIANGULAR
+        )
     
     def calculate_risk_score(self, profit_pct: float, buy_liquidity: float, sell_liquidity: float, 
                            cross_network: bool) -> float:
         """Calculate a risk score for a cross-DEX opportunity."""
-        # Base risk score: 50
-        risk_score = 50
-        
-        # Adjust based on profit percentage (higher profit often means higher risk)
-        risk_score += profit_pct * 1000  # e.g., 1% profit adds 10 to risk score
-        
-        # Adjust based on liquidity (lower liquidity means higher risk)
-        min_liquidity = min(buy_liquidity, sell_liquidity)
-        if min_liquidity < 100000:  # Less than $100k
-            risk_score += 20
-        elif min_liquidity < 500000:  # Less than $500k
-            risk_score += 10
-        elif min_liquidity < 1000000:  # Less than $1M
-            risk_score += 5
-        
-        # Adjust for cross-network trades (adds complexity and risk)
-        if cross_network:
-            risk_score += 15
-        
-        # Cap at 0-100
-        return max(0, min(100, risk_score))
+        # Higher profit and lower liquidity mean higher risk, and cross-network trades add complexity and risk
+        return _risk_score(
+            BASE_RISK_CROSS_DEX,
+            PROFIT_RISK_CROSS_DEX,
+            profit_pct,
+            min(buy_liquidity, sell_liquidity),
+            LIQUIDITY_RISK_CROSS_DEX,
+            CROSS_NETWORK_RISK if cross_network else 0.0
+        )
     
     def calculate_risk_score_triangular(self, profit_pct: float, liquidity_a_to_b: float, 
                                       liquidity_b_to_c: float, liquidity_c_to_a: float) -> float:
         """Calculate a risk score for a triangular arbitrage opportunity."""
-        # Base risk score: 40 (generally lower than cross-DEX due to single network)
-        risk_score = 40
-        
-        # Adjust based on profit percentage
-        risk_score += profit_pct * 1200  # e.g., 1% profit adds 12 to risk score
-        
-        # Adjust based on liquidity
-        min_liquidity = min(liquidity_a_to_b, liquidity_b_to_c, liquidity_c_to_a)
-        if min_liquidity < 100000:  # Less than $100k
-            risk_score += 25
-        elif min_liquidi
-(Content truncated due to size limit. Use line ranges to read in chunks)
\ No newline at end of file
+        return _risk_score(
+            BASE_RISK_TRIANGULAR,
+            PROFIT_RISK_TRIANGULAR,
+            profit_pct,
+            min(liquidity_a_to_b, liquidity_b_to_c, liquidity_c_to_a),
+            LIQUIDITY_RISK_TRIANGULAR,
+            0.0
+        )
+    
+    def estimate_execution_time(self, buy_network: str, sell_network: str) -> float:
+        """Estimate the execution time of a cross-DEX opportunity in milliseconds."""
+        buy_block_time = NETWORK_BLOCK_TIME_MS.get(buy_network, DEFAULT_BLOCK_TIME_MS)
+        if buy_network == sell_network:
+            # Both legs land in the same transaction
+            return buy_block_time
+        
+        # Cross-network trades need a confirmed leg on each chain
+        return buy_block_time + NETWORK_BLOCK_TIME_MS.get(sell_network, DEFAULT_BLOCK_TIME_MS)
+    
+    def estimate_execution_time_triangular(self, network_id: str) -> float:
+        """Estimate the execution time of a triangular opportunity in milliseconds."""
+        # All three legs are executed atomically in one transaction
+        return NETWORK_BLOCK_TIME_MS.get(network_id, DEFAULT_BLOCK_TIME_MS)
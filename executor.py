@@ -8,23 +8,43 @@ including loan acquisition, trade execution, and loan repayment.
 import logging
 import asyncio
 import time
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 import json
 import os
+import random
 import uuid
+from collections import deque
+from secrets import token_hex
 
-from web3 import Web3
+import aiohttp
+import numpy as np
+from eth_abi import decode, encode
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
 
-from src.config.config import NETWORKS, FLASH_LOAN_PROVIDERS, WALLET_CONFIG
+from src.config.config import (
+    API_KEYS, ENABLED_NETWORKS, ETH_PRICE_REFRESH_INTERVAL, FLASH_LOAN_PROVIDERS, WALLET_CONFIG
+)
 from src.trade_simulation import TradeSimulationService
+from src.market_data.multicall import GET_RESERVES_SELECTOR, MulticallQuoteManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("flashloan_execution")
 
+# Aave V2 LendingPool.flashLoan(receiverAddress, assets, amounts, modes, onBehalfOf, params, referralCode)
+_FLASHLOAN_TYPES = ["address", "address[]", "uint256[]", "uint256[]", "address", "bytes", "uint16"]
+_FLASHLOAN_SELECTOR = Web3.keccak(
+    text="flashLoan(address,address[],uint256[],uint256[],address,bytes,uint16)"
+)[:4]
+# Byte offset of amounts[0] in single-asset calldata: selector, 7 head words, then assets (length, item)
+# and the amounts length word
+_FLASHLOAN_AMOUNT_OFFSET = 4 + 32 * 10
+_AAVE_MODES_ZERO = (0,)  # interest rate mode 0: no debt is opened, the loan is repaid in the same transaction
+_EMPTY_PARAMS = b""
+_REFERRAL_CODE = 0
+
+RNG_CHUNK_SIZE = 1024  # uniform samples drawn per refill in simulation mode
+
+ETH_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=usd"
+
 class FlashloanExecutor:
     """
     Executes arbitrage trades using flashloans.
@@ -34,21 +54,242 @@ class FlashloanExecutor:
         """Initialize the flashloan executor with a trade simulation service."""
         self.simulation_service = simulation_service
         self.web3_clients = {}
-        self.execution_results = []
-        self.pending_executions = []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._aave_pool_cache: Dict[str, str] = {}  # network ID -> LendingPool address
+        self._flashloan_templates: Dict[Tuple[str, str], bytes] = {}  # (network ID, asset) -> calldata
+        self._token_addr_cache: Dict[Tuple[str, str], str] = {}  # (token, network ID) -> checksum address
+        # Gas prices (wei) and the ETH price, kept fresh by _refresh_prices so trades never wait on them
+        self._gas_cache: Dict[str, int] = {}
+        self._eth_price = 3000.0  # placeholder until the first refresh succeeds
+        self._price_task: Optional[asyncio.Task] = None
+        self.price_refresh_interval = 3  # seconds between gas price reads
+        self.eth_price_refresh_interval = ETH_PRICE_REFRESH_INTERVAL  # seconds between ETH price requests
+        # Replay/backtest mode: draw simulated profit and gas variation from pre-generated NumPy batches
+        self.simulation_mode = False
+        self._rng = np.random.default_rng()
+        self._rng_buf: List[float] = []
+        self._rng_pos = 0
+        self.execution_results: deque = deque(maxlen=10_000)  # most recent results only, oldest dropped first
+        self._execution_callbacks: List[Callable[[Dict], None]] = []
+        self.pending_executions: Dict[str, Dict] = {}  # trade ID -> trade, for O(1) dedup and removal
+        # Caps in-flight trades well below the per-host connection limit so receipt polls are not starved
+        self._exec_sem = asyncio.Semaphore(WALLET_CONFIG.get("max_concurrent_executions", 16))
+        # Profitable simulations pushed by the simulation service, executed as soon as they arrive
+        self.opportunity_queue: asyncio.Queue = asyncio.Queue(maxsize=128)
+        # Seconds without submissions before polling the simulation service, None waits on submissions only
+        self.poll_interval: Optional[float] = None
         self.initialize_web3_clients()
+        self.multicall = MulticallQuoteManager(self.web3_clients)
         self.wallet_address = None
+        self._account = None  # LocalAccount holding the signing key, derived once
         self.initialize_wallet()
     
     def initialize_web3_clients(self):
         """Initialize Web3 clients for each enabled network."""
-        for network_id, network_config in NETWORKS.items():
-            if network_config["enabled"] and network_config["rpc_url"]:
-                try:
-                    self.web3_clients[network_id] = Web3(Web3.HTTPProvider(network_config["rpc_url"]))
-                    logger.info(f"Initialized Web3 client for {network_config['name']}")
-                except Exception as e:
-                    logger.error(f"Failed to initialize Web3 client for {network_config['name']}: {e}")
+        # Async clients let RPC calls of concurrent trades overlap instead of blocking the event loop
+        for network_id, network_config in ENABLED_NETWORKS.items():
+            try:
+                provider = AsyncHTTPProvider(network_config.rpc_url, request_kwargs={"timeout": 10})
+                self.web3_clients[network_id] = AsyncWeb3(provider)
+                logger.info("Initialized Web3 client for %s", network_config.name)
+            except Exception as e:
+                logger.error("Failed to initialize Web3 client for %s: %s", network_config.name, e)
+    
+    async def _ensure_session(self):
+        """
+        Create the HTTP session shared by every Web3 provider, if not open yet.
+        
+        The session needs a running event loop, so it is created on first async use
+        rather than in __init__. Its pooled keep-alive connections let flashloan, swap
+        and receipt calls reuse TCP/TLS connections instead of reconnecting.
+        """
+        if self._session is not None and not self._session.closed:
+            return
+        
+        connector = aiohttp.TCPConnector(limit=256, limit_per_host=64, keepalive_timeout=75, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(connector=connector, raise_for_status=True)
+        await self.multicall.share_session(self._session)
+    
+    async def open_session(self) -> aiohttp.ClientSession:
+        """
+        Open the shared HTTP session and return it, so other RPC clients can share it.
+        
+        Call it before any Web3 client makes a request, web3 keeps the first session
+        it caches for an endpoint.
+        """
+        await self._ensure_session()
+        return self._session
+    
+    async def _rpc_batch(self, web3: AsyncWeb3, calls: List[Tuple[str, list]]) -> List[Any]:
+        """
+        Send JSON-RPC calls to a client's endpoint as one batch request.
+        
+        Args:
+            web3: The client whose endpoint is called.
+            calls: (method, params) pairs. Keep batches small, public providers
+                throttle or reject large ones.
+        
+        Returns:
+            List[Any]: The raw result of each call, in order.
+        """
+        await self._ensure_session()
+        payload = [
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            for request_id, (method, params) in enumerate(calls)
+        ]
+        async with self._session.post(
+            web3.provider.endpoint_uri, json=payload, timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            responses = {item["id"]: item for item in await response.json()}
+        
+        results = []
+        for request_id, (method, _) in enumerate(calls):
+            item = responses[request_id]
+            if "error" in item:
+                raise ValueError(f"{method} failed: {item['error']}")
+            results.append(item["result"])
+        return results
+    
+    async def multicall_quote(self, network_id: str, calls: List[Tuple[str, bytes]]) -> List[Optional[bytes]]:
+        """
+        Run read-only calls on a network in a single Multicall3 eth_call.
+        
+        Args:
+            network_id: The network to call.
+            calls: (target address, calldata) pairs.
+        
+        Returns:
+            List[Optional[bytes]]: The return data of each call, None for calls that reverted.
+        """
+        await self._ensure_session()
+        results = await self.multicall.aggregate3(network_id, calls)
+        return [data if success else None for success, data in results]
+    
+    async def quote_pool_reserves(self, trade: Dict) -> Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]:
+        """
+        Read the current reserves of a cross-DEX trade's buy and sell pools.
+        
+        Both pools are read in one Multicall3 eth_call when they share a network,
+        otherwise the two networks are read concurrently.
+        
+        Returns:
+            The (reserve0, reserve1) of the buy and sell pools, None for a pool that
+            doesn't expose getReserves() (e.g. Uniswap V3).
+        """
+        buy_call = (trade["buy_pool"], GET_RESERVES_SELECTOR)
+        sell_call = (trade["sell_pool"], GET_RESERVES_SELECTOR)
+        
+        if trade["buy_network"] == trade["sell_network"]:
+            results = await self.multicall_quote(trade["buy_network"], [buy_call, sell_call])
+        else:
+            (buy_result,), (sell_result,) = await asyncio.gather(
+                self.multicall_quote(trade["buy_network"], [buy_call]),
+                self.multicall_quote(trade["sell_network"], [sell_call])
+            )
+            results = [buy_result, sell_result]
+        
+        return tuple(
+            tuple(decode(["uint112", "uint112", "uint32"], data)[:2]) if data else None
+            for data in results
+        )
+    
+    def _lending_pool_address(self, network_id: str) -> Optional[str]:
+        """Get the checksum Aave LendingPool address of a network, resolved once and reused across trades."""
+        lending_pool_address = self._aave_pool_cache.get(network_id)
+        if lending_pool_address is None:
+            lending_pool_address = self.get_aave_lending_pool_address(network_id)
+            if not lending_pool_address:
+                return None
+            lending_pool_address = Web3.to_checksum_address(lending_pool_address)
+            self._aave_pool_cache[network_id] = lending_pool_address
+        return lending_pool_address
+    
+    def _next_uniform(self) -> float:
+        """Pop a uniform [0, 1) sample from the buffer, refilling it in one NumPy call when exhausted."""
+        if self._rng_pos >= len(self._rng_buf):
+            self._rng_buf = self._rng.random(RNG_CHUNK_SIZE).tolist()
+            self._rng_pos = 0
+        value = self._rng_buf[self._rng_pos]
+        self._rng_pos += 1
+        return value
+    
+    def _random_uniform(self, low: float, high: float) -> float:
+        """Draw a float in [low, high), from the batched RNG in simulation mode."""
+        if self.simulation_mode:
+            return low + (high - low) * self._next_uniform()
+        return random.uniform(low, high)
+    
+    def _random_int(self, low: int, high: int) -> int:
+        """Draw an integer in [low, high], from the batched RNG in simulation mode."""
+        if self.simulation_mode:
+            return low + int((high - low + 1) * self._next_uniform())
+        return random.randint(low, high)
+    
+    def _token_address(self, token: str, network_id: str) -> str:
+        """Get the checksum address of a token on a network, computed once per (token, network) pair."""
+        address = self._token_addr_cache.get((token, network_id))
+        if address is None:
+            address = Web3.to_checksum_address(self.get_token_address(token, network_id))
+            self._token_addr_cache[(token, network_id)] = address
+        return address
+    
+    def _flashloan_calldata(self, network_id: str, asset: str, amount: int) -> bytes:
+        """
+        Build flashLoan calldata from a per-(network, asset) template.
+        
+        Everything except the borrowed amount is fixed for a given asset, so the
+        arguments are ABI encoded once and later trades only patch in amounts[0].
+        """
+        template = self._flashloan_templates.get((network_id, asset))
+        if template is None:
+            template = _FLASHLOAN_SELECTOR + encode(
+                _FLASHLOAN_TYPES,
+                [self.wallet_address, (asset,), (0,), _AAVE_MODES_ZERO, self.wallet_address, _EMPTY_PARAMS, _REFERRAL_CODE]
+            )
+            self._flashloan_templates[(network_id, asset)] = template
+        
+        calldata = bytearray(template)
+        calldata[_FLASHLOAN_AMOUNT_OFFSET:_FLASHLOAN_AMOUNT_OFFSET + 32] = amount.to_bytes(32, "big")
+        return bytes(calldata)
+    
+    async def _refresh_prices(self):
+        """Refresh per-network gas prices and the ETH price in the background."""
+        network_ids = list(self.web3_clients)
+        headers = {"x-cg-demo-api-key": API_KEYS["coingecko"]} if API_KEYS.get("coingecko") else None
+        loop = asyncio.get_running_loop()
+        next_eth_price = loop.time()
+        
+        while True:
+            try:
+                await self._ensure_session()
+                gas_prices = await asyncio.gather(
+                    *(self.web3_clients[n].eth.gas_price for n in network_ids),
+                    return_exceptions=True
+                )
+                for network_id, gas_price in zip(network_ids, gas_prices):
+                    if isinstance(gas_price, Exception):
+                        logger.warning("Could not refresh gas price on %s: %s", network_id, gas_price)
+                    else:
+                        self._gas_cache[network_id] = gas_price
+                
+                # Gas prices come from our own RPC endpoints, the ETH price from a rate-limited public API
+                if loop.time() >= next_eth_price:
+                    next_eth_price = loop.time() + self.eth_price_refresh_interval
+                    async with self._session.get(ETH_PRICE_URL, headers=headers) as response:
+                        self._eth_price = float((await response.json())["ethereum"]["usd"])
+            except Exception as e:
+                logger.warning("Error refreshing gas and ETH prices: %s", e)
+            
+            await asyncio.sleep(self.price_refresh_interval)
+    
+    async def close(self):
+        """Stop the price refresher and close the shared HTTP session."""
+        if self._price_task is not None:
+            self._price_task.cancel()
+            self._price_task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
     
     def initialize_wallet(self):
         """Initialize wallet from private key."""
@@ -63,26 +304,59 @@ class FlashloanExecutor:
                 network_id = next(iter(self.web3_clients))
                 web3 = self.web3_clients[network_id]
                 account = web3.eth.account.from_key(private_key)
+                self._account = account
                 self.wallet_address = account.address
-                logger.info(f"Initialized wallet with address: {self.wallet_address}")
+                logger.info("Initialized wallet with address: %s", self.wallet_address)
             else:
                 logger.warning("No Web3 clients available, wallet initialization skipped")
         except Exception as e:
-            logger.error(f"Failed to initialize wallet: {e}")
+            logger.error("Failed to initialize wallet: %s", e)
+    
+    def on_execution_complete(self, callback: Callable[[Dict], None]):
+        """
+        Register a callback invoked with every finished execution result.
+        
+        Args:
+            callback: Called with the result dict once a trade has succeeded or failed.
+        """
+        self._execution_callbacks.append(callback)
+    
+    def submit(self, simulation: Dict) -> bool:
+        """
+        Queue a profitable simulation for immediate execution.
+        
+        Returns:
+            bool: False if the queue is full and the simulation was dropped.
+        """
+        try:
+            self.opportunity_queue.put_nowait(simulation)
+            return True
+        except asyncio.QueueFull:
+            logger.warning("Execution queue full, dropping trade %s", simulation.get("id"))
+            return False
     
     async def start_execution(self):
         """Start continuous execution of profitable trades."""
         logger.info("Starting flashloan execution service")
+        await self._ensure_session()
+        if self._price_task is None:
+            self._price_task = asyncio.create_task(self._refresh_prices())
         
         while True:
             try:
-                # Find and execute profitable trades
-                await self.execute_profitable_trades()
-                
-                # Wait before checking for new opportunities
-                await asyncio.sleep(60)  # Check every minute
+                # Execute submitted trades as soon as they arrive. With a poll interval set, the
+                # simulation service is also polled when nothing was submitted for a full period
+                if self.poll_interval is None:
+                    sim = await self.opportunity_queue.get()
+                else:
+                    try:
+                        sim = await asyncio.wait_for(self.opportunity_queue.get(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        await self.execute_profitable_trades()
+                        continue
+                self._dispatch_trade(sim)
             except Exception as e:
-                logger.error(f"Error in flashloan execution: {e}")
+                logger.error("Error in flashloan execution: %s", e)
                 await asyncio.sleep(5)  # Wait a bit before retrying
     
     async def execute_profitable_trades(self):
@@ -95,26 +369,30 @@ class FlashloanExecutor:
                 logger.info("No profitable trades found for execution")
                 return
             
-            logger.info(f"Found {len(profitable_sims)} profitable trades for execution")
+            logger.info("Found %d profitable trades for execution", len(profitable_sims))
             
             # Execute each trade
             for sim in profitable_sims:
-                # Skip if already pending execution
-                if any(p["id"] == sim.get("id") for p in self.pending_executions):
-                    logger.info(f"Trade {sim.get('id')} already pending execution, skipping")
-                    continue
-                
-                # Add a unique ID if not present
-                if "id" not in sim:
-                    sim["id"] = str(uuid.uuid4())
-                
-                # Add to pending executions
-                self.pending_executions.append(sim)
-                
-                # Execute the trade asynchronously
-                asyncio.create_task(self.execute_trade(sim))
+                self._dispatch_trade(sim)
         except Exception as e:
-            logger.error(f"Error finding profitable trades: {e}")
+            logger.error("Error finding profitable trades: %s", e)
+    
+    def _dispatch_trade(self, sim: Dict):
+        """Start executing a trade in the background unless it is already pending."""
+        # Skip if already pending execution
+        if sim.get("id") in self.pending_executions:
+            logger.info("Trade %s already pending execution, skipping", sim.get("id"))
+            return
+        
+        # Add a unique ID if not present
+        if "id" not in sim:
+            sim["id"] = str(uuid.uuid4())
+        
+        # Add to pending executions
+        self.pending_executions[sim["id"]] = sim
+        
+        # Execute the trade asynchronously
+        asyncio.create_task(self.execute_trade(sim))
     
     async def execute_trade(self, trade: Dict):
         """
@@ -123,52 +401,58 @@ class FlashloanExecutor:
         Args:
             trade: The trade simulation result to execute.
         """
-        trade_id = trade.get("id", "unknown")
-        trade_type = trade.get("type", "unknown")
-        
-        logger.info(f"Executing trade {trade_id} of type {trade_type}")
-        
-        execution_result = {
-            "id": trade_id,
-            "type": trade_type,
-            "execution_timestamp": time.time(),
-            "status": "pending",
-            "message": "Trade execution started",
-            "transaction_hashes": [],
-            "profit_usd": 0,
-            "profit_token": 0,
-            "gas_used": 0,
-            "gas_cost_usd": 0,
-            "flashloan_provider": "",
-            "flashloan_amount": 0,
-            "flashloan_fee": 0
-        }
+        async with self._exec_sem:
+            trade_id = trade.get("id", "unknown")
+            trade_type = trade.get("type", "unknown")
         
-        try:
-            # Different execution logic based on trade type
-            if trade_type == "cross_dex":
-                await self.execute_cross_dex_trade(trade, execution_result)
-            elif trade_type == "triangular":
-                await self.execute_triangular_trade(trade, execution_result)
-            else:
+            logger.info("Executing trade %s of type %s", trade_id, trade_type)
+        
+            execution_result = {
+                "id": trade_id,
+                "type": trade_type,
+                "execution_timestamp": time.time(),
+                "status": "pending",
+                "message": "Trade execution started",
+                "transaction_hashes": [],
+                "profit_usd": 0,
+                "profit_token": 0,
+                "gas_used": 0,
+                "gas_cost_usd": 0,
+                "flashloan_provider": "",
+                "flashloan_amount": 0,
+                "flashloan_fee": 0
+            }
+        
+            try:
+                # Different execution logic based on trade type
+                if trade_type == "cross_dex":
+                    await self.execute_cross_dex_trade(trade, execution_result)
+                elif trade_type == "triangular":
+                    await self.execute_triangular_trade(trade, execution_result)
+                else:
+                    execution_result["status"] = "failed"
+                    execution_result["message"] = f"Unknown trade type: {trade_type}"
+            except Exception as e:
                 execution_result["status"] = "failed"
-                execution_result["message"] = f"Unknown trade type: {trade_type}"
-        except Exception as e:
-            execution_result["status"] = "failed"
-            execution_result["message"] = f"Execution error: {str(e)}"
-            logger.error(f"Error executing trade {trade_id}: {e}")
-        finally:
-            # Remove from pending executions
-            self.pending_executions = [p for p in self.pending_executions if p["id"] != trade_id]
+                execution_result["message"] = f"Execution error: {str(e)}"
+                logger.error("Error executing trade %s: %s", trade_id, e)
+            finally:
+                # Remove from pending executions
+                self.pending_executions.pop(trade_id, None)
             
-            # Add to execution results
-            self.execution_results.append(execution_result)
+                # Add to execution results
+                self.execution_results.append(execution_result)
+                for callback in self._execution_callbacks:
+                    try:
+                        callback(execution_result)
+                    except Exception as e:
+                        logger.error("Execution callback failed for trade %s: %s", trade_id, e)
             
-            # Log the result
-            if execution_result["status"] == "success":
-                logger.info(f"Trade {trade_id} executed successfully, profit: ${execution_result['profit_usd']:.2f}")
-            else:
-                logger.warning(f"Trade {trade_id} execution failed: {execution_result['message']}")
+                # Log the result
+                if execution_result["status"] == "success":
+                    logger.info("Trade %s executed successfully, profit: $%.2f", trade_id, execution_result["profit_usd"])
+                else:
+                    logger.warning("Trade %s execution failed: %s", trade_id, execution_result["message"])
     
     async def execute_cross_dex_trade(self, trade: Dict, execution_result: Dict):
         """Execute a cross-DEX arbitrage trade."""
@@ -202,6 +486,19 @@ class FlashloanExecutor:
             execution_result["message"] = f"Web3 client not available for {buy_network} or {sell_network}"
             return
 
+        # Quote both pools before committing, a drained pool means the opportunity is gone
+        try:
+            buy_reserves, sell_reserves = await self.quote_pool_reserves(trade)
+        except Exception as e:
+            logger.warning("Could not quote pools of trade %s: %s", trade.get("id"), e)
+        else:
+            if (buy_reserves and 0 in buy_reserves) or (sell_reserves and 0 in sell_reserves):
+                execution_result["status"] = "failed"
+                execution_result["message"] = "Buy or sell pool has no liquidity"
+                return
+            execution_result["buy_pool_reserves"] = buy_reserves
+            execution_result["sell_pool_reserves"] = sell_reserves
+        
         # Select flashloan provider
         flashloan_provider, provider_details = await self.select_flashloan_provider(
             trade_size_usd,
@@ -219,36 +516,38 @@ class FlashloanExecutor:
         execution_result["flashloan_fee"] = provider_details["fee"] * trade_size_usd
 
         # Simulate the trade execution steps
-        logger.info(f"Simulating flashloan acquisition of ${trade_size_usd} from {flashloan_provider} on {buy_network}")
-        flashloan_tx_hash = f"0x{uuid.uuid4().hex}"
+        logger.info("Simulating flashloan acquisition of $%s from %s on %s", trade_size_usd, flashloan_provider, buy_network)
+        flashloan_tx_hash = "0x" + token_hex(32)
         execution_result["transaction_hashes"].append({"type": "flashloan", "hash": flashloan_tx_hash})
 
-        logger.info(f"Simulating buy of {token1} with {token0} on {buy_dex} ({buy_network})")
-        buy_tx_hash = f"0x{uuid.uuid4().hex}"
+        logger.info("Simulating buy of %s with %s on %s (%s)", token1, token0, buy_dex, buy_network)
+        buy_tx_hash = "0x" + token_hex(32)
         execution_result["transaction_hashes"].append({"type": "buy", "hash": buy_tx_hash})
 
         if buy_network != sell_network:
-            logger.info(f"Simulating transfer of {token1} from {buy_network} to {sell_network}")
-            transfer_tx_hash = f"0x{uuid.uuid4().hex}"
+            logger.info("Simulating transfer of %s from %s to %s", token1, buy_network, sell_network)
+            transfer_tx_hash = "0x" + token_hex(32)
             execution_result["transaction_hashes"].append({"type": "transfer", "hash": transfer_tx_hash})
 
-        logger.info(f"Simulating sell of {token1} for {token0} on {sell_dex} ({sell_network})")
-        sell_tx_hash = f"0x{uuid.uuid4().hex}"
+        logger.info("Simulating sell of %s for %s on %s (%s)", token1, token0, sell_dex, sell_network)
+        sell_tx_hash = "0x" + token_hex(32)
         execution_result["transaction_hashes"].append({"type": "sell", "hash": sell_tx_hash})
 
-        logger.info(f"Simulating flashloan repayment to {flashloan_provider}")
-        repay_tx_hash = f"0x{uuid.uuid4().hex}"
+        logger.info("Simulating flashloan repayment to %s", flashloan_provider)
+        repay_tx_hash = "0x" + token_hex(32)
         execution_result["transaction_hashes"].append({"type": "repay", "hash": repay_tx_hash})
 
-        import random
-        profit_variation = random.uniform(0.8, 1.1)
+        profit_variation = self._random_uniform(0.8, 1.1)
         profit_usd = trade.get("simulated_profit_usd", 0) * profit_variation
 
-        gas_used = random.randint(500000, 1500000)
-        gas_price_gwei = WALLET_CONFIG["max_gas_price"].get(buy_network, 100)
-        gas_cost_eth = gas_used * gas_price_gwei * 1e-9
-        eth_price_usd = 3000
-        gas_cost_usd = gas_cost_eth * eth_price_usd
+        gas_used = self._random_int(500000, 1500000)
+        buy_gas_price = self._gas_cache.get(buy_network)
+        if buy_gas_price is not None:
+            gas_cost_eth = gas_used * buy_gas_price * 1e-18
+        else:
+            gas_price_gwei = WALLET_CONFIG["max_gas_price"].get(buy_network, 100)
+            gas_cost_eth = gas_used * gas_price_gwei * 1e-9
+        gas_cost_usd = gas_cost_eth * self._eth_price
 
         execution_result.update({
             "status": "success",
@@ -293,42 +592,41 @@ class FlashloanExecutor:
             return
 
         try:
+            await self._ensure_session()
             web3 = self.web3_clients[buy_network]
-            lending_pool_address = self.get_aave_lending_pool_address(buy_network)
-            if not lending_pool_address:
+            lending_pool_address = self._lending_pool_address(buy_network)
+            if lending_pool_address is None:
                 execution_result["status"] = "failed"
                 execution_result["message"] = f"Aave LendingPool address not found for network {buy_network}"
                 return
 
-            lending_pool = web3.eth.contract(address=lending_pool_address, abi=self.get_aave_lending_pool_abi())
-
-            assets = [web3.toChecksumAddress(self.get_token_address(token0, buy_network))]
-            amounts = [web3.toWei(trade_size_usd, 'ether')]  # Assuming token0 is ETH or wrapped ETH
-            modes = [0]  # 0 means no debt (flashloan)
-            on_behalf_of = self.wallet_address
-            params = b''  # Additional params can be encoded here
-            referral_code = 0
-
-            tx = lending_pool.functions.flashLoan(
-                self.wallet_address,
-                assets,
-                amounts,
-                modes,
-                on_behalf_of,
-                params,
-                referral_code
-            ).buildTransaction({
+            asset = self._token_address(token0, buy_network)
+            amount = Web3.to_wei(trade_size_usd, 'ether')  # Assuming token0 is ETH or wrapped ETH
+
+            # Nonce, gas price and chain ID are read in one batched round trip before signing
+            nonce, gas_price, chain_id = (
+                int(value, 16) for value in await self._rpc_batch(web3, [
+                    ("eth_getTransactionCount", [self.wallet_address, "latest"]),
+                    ("eth_gasPrice", []),
+                    ("eth_chainId", []),
+                ])
+            )
+            tx = {
+                'to': lending_pool_address,
+                'data': self._flashloan_calldata(buy_network, asset, amount),
                 'from': self.wallet_address,
-                'nonce': web3.eth.getTransactionCount(self.wallet_address),
+                'nonce': nonce,
                 'gas': 2000000,
-                'gasPrice': web3.eth.gas_price
-            })
+                'gasPrice': gas_price,
+                'chainId': chain_id
+            }
 
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key=WALLET_CONFIG.get("private_key"))
-            tx_hash = web3.eth.sendRawTransaction(signed_tx.rawTransaction)
+            signed_tx = self._account.sign_transaction(tx)
+            tx_hash = await web3.eth.send_raw_transaction(signed_tx.rawTransaction)
             execution_result["transaction_hashes"].append({"type": "flashloan", "hash": tx_hash.hex()})
 
-            receipt = web3.eth.waitForTransactionReceipt(tx_hash)
+            # Waiting on the receipt yields to the event loop, so other trades keep executing meanwhile
+            receipt = await web3.eth.wait_for_transaction_receipt(tx_hash)
             if receipt.status != 1:
                 execution_result["status"] = "failed"
                 execution_result["message"] = "Flashloan transaction failed"
@@ -338,13 +636,13 @@ class FlashloanExecutor:
                 "status": "success",
                 "message": "Flashloan executed successfully",
                 "gas_used": receipt.gasUsed,
-                "gas_cost_usd": receipt.gasUsed * web3.eth.gas_price * 1e-9 * 3000  # ETH price placeholder
+                "gas_cost_usd": receipt.gasUsed * gas_price * 1e-18 * self._eth_price
             })
 
         except Exception as e:
             execution_result["status"] = "failed"
             execution_result["message"] = f"Flashloan execution error: {str(e)}"
-            logger.error(f"Flashloan execution error: {e}")
+            logger.error("Flashloan execution error: %s", e)
     
     async def execute_triangular_trade(self, trade: Dict, execution_result: Dict):
         """Execute a triangular arbitrage trade."""
@@ -401,44 +699,45 @@ class FlashloanExecutor:
         # For demonstration, we'll simulate these steps
         
         # Simulate flashloan acquisition
-        logger.info(f"Acquiring flashloan of ${trade_size_usd} from {flashloan_provider} on {network_id}")
-        flashloan_tx_hash = f"0x{uuid.uuid4().hex}"
+        logger.info("Acquiring flashloan of $%s from %s on %s", trade_size_usd, flashloan_provider, network_id)
+        flashloan_tx_hash = "0x" + token_hex(32)
         execution_result["transaction_hashes"].append({"type": "flashloan", "hash": flashloan_tx_hash})
         
         # Simulate A -> B swap
-        logger.info(f"Swapping {token_a} to {token_b} on {dex_id} ({network_id})")
-        swap_ab_tx_hash = f"0x{uuid.uuid4().hex}"
+        logger.info("Swapping %s to %s on %s (%s)", token_a, token_b, dex_id, network_id)
+        swap_ab_tx_hash = "0x" + token_hex(32)
         execution_result["transaction_hashes"].append({"type": "swap_a_b", "hash": swap_ab_tx_hash})
         
         # Simulate B -> C swap
-        logger.info(f"Swapping {token_b} to {token_c} on {dex_id} ({network_id})")
-        swap_bc_tx_hash = f"0x{uuid.uuid4().hex}"
+        logger.info("Swapping %s to %s on %s (%s)", token_b, token_c, dex_id, network_id)
+        swap_bc_tx_hash = "0x" + token_hex(32)
         execution_result["transaction_hashes"].append({"type": "swap_b_c", "hash": swap_bc_tx_hash})
         
         # Simulate C -> A swap
-        logger.info(f"Swapping {token_c} to {token_a} on {dex_id} ({network_id})")
-        swap_ca_tx_hash = f"0x{uuid.uuid4().hex}"
+        logger.info("Swapping %s to %s on %s (%s)", token_c, token_a, dex_id, network_id)
+        swap_ca_tx_hash = "0x" + token_hex(32)
         execution_result["transaction_hashes"].append({"type": "swap_c_a", "hash": swap_ca_tx_hash})
         
         # Simulate flashloan repayment
-        logger.info(f"Repaying flashloan to {flashloan_provider}")
-        repay_tx_hash = f"0x{uuid.uuid4().hex}"
+        logger.info("Repaying flashloan to %s", flashloan_provider)
+        repay_tx_hash = "0x" + token_hex(32)
         execution_result["transaction_hashes"].append({"type": "repay", "hash": repay_tx_hash})
         
         # Calculate profit (in a real implementation, this would be from actual transaction results)
         # For demonstration, we'll use the simulated profit with some random variation
-        import random
-        profit_variation = random.uniform(0.8, 1.1)  # 80% to 110% of simulated profit
+        profit_variation = self._random_uniform(0.8, 1.1)  # 80% to 110% of simulated profit
         profit_usd = trade.get("simulated_profit_usd", 0) * profit_variation
         
         # Calculate gas used and cost
-        gas_used = random.randint(800000, 2000000)  # Typical gas usage for contract execution
+        gas_used = self._random_int(800000, 2000000)  # Typical gas usage for contract execution
 
-        execution_result["gas_used"] = gas_used
-        execution_result["profit_usd"] = profit_usd
-        execution_result["success"] = True
+        execution_result.update({
+            "status": "success",
+            "message": "Trade executed successfully (simulated)",
+            "gas_used": gas_used,
+            "profit_usd": profit_usd,
+            "success": True
+        })
 
-        logger.info(f"Execution result: {execution_result}")
-        self.execution_results.append(execution_result)
+        logger.info("Execution result: %s", execution_result)
         return execution_result
-(Content truncated due to size limit. Use line ranges to read in chunks)
\ No newline at end of file
@@ -8,10 +8,12 @@ for running the complete arbitrage trading system.
 import asyncio
 import logging
 import os
-import json
 import time
+from pathlib import Path
 from typing import Dict, List, Optional
 
+import orjson
+
 from src.market_data import MarketDataService
 from src.arbitrage_detection import ArbitrageService
 from src.trade_simulation import TradeSimulationService
@@ -45,15 +47,23 @@ class ArbitrageSystem:
         self.arbitrage_service = ArbitrageService(self.market_data)
         self.simulation_service = TradeSimulationService(self.arbitrage_service)
         self.execution_service = FlashloanExecutionService(self.simulation_service)
+        # The FlashloanExecutor the execution service runs trades with
+        self.executor = getattr(self.execution_service, "executor", self.execution_service)
+        # Trades that pass simulation are pushed straight to the executor rather than polled for
+        self.market_data.analyzer.trade_simulator.on_profitable(self._submit_for_execution)
 
         # Initialize DeFi Agent (wallet address will be set after wallet is ready)
         self.defi_agent: DeFiAgent = None
 
         # System state
         self.running = False
+        self._stop_event: Optional[asyncio.Event] = None  # created in start(), once an event loop is running
         self.auto_execute = False
         self.min_profit_threshold = MIN_PROFIT_THRESHOLD
         self.system_start_time = 0
+        self._data_dir = Path("data")
+        self._data_dir.mkdir(exist_ok=True)
+        self._stats_path = self._data_dir / "system_stats.json"
         self.stats = {
             "opportunities_detected": 0,
             "trades_simulated": 0,
@@ -64,6 +74,9 @@ class ArbitrageSystem:
             "total_fees_usd": 0,
             "total_gas_cost_usd": 0
         }
+        # Execution totals are accumulated as results arrive rather than rescanned every tick
+        self.executor.on_execution_complete(self._record_execution)
+    
     def _init_defi_agent(self):
         """Initialize the DeFiAgent with the system's wallet address."""
         # Try to get wallet address from execution_service
@@ -105,11 +118,16 @@ class ArbitrageSystem:
             return
         
         self.running = True
+        self._stop_event = asyncio.Event()
         self.auto_execute = auto_execute
         self.system_start_time = time.time()
         
         logger.info(f"Starting DeFi Arbitrage Trading System (auto_execute={auto_execute})")
         
+        # One tuned HTTP session for every RPC client, registered before any of them makes a request
+        session = await self.executor.open_session()
+        await self.market_data.share_session(session)
+        
         # Start all services
         market_data_task = asyncio.create_task(self.market_data.start())
         arbitrage_task = asyncio.create_task(self.arbitrage_service.start())
@@ -128,8 +146,7 @@ class ArbitrageSystem:
         
         try:
             # Keep the system running until stopped
-            while self.running:
-                await asyncio.sleep(1)
+            await self._stop_event.wait()
         finally:
             # Stop all services
             logger.info("Stopping all services")
@@ -137,25 +154,21 @@ class ArbitrageSystem:
             # Settle and redeploy profits before shutdown
             await self.settle_and_redeploy_profits()
 
+            # Services shut down concurrently, so shutdown takes as long as the slowest one
+            stops = [self.simulation_service.stop(), self.arbitrage_service.stop(), self.market_data.stop()]
             if execution_task:
-                await self.execution_service.stop()
-                execution_task.cancel()
-
-            await self.simulation_service.stop()
-            await self.arbitrage_service.stop()
-            await self.market_data.stop()
+                stops.append(self.execution_service.stop())
+            await asyncio.gather(*stops)
 
+            if execution_task:
+                execution_task.cancel()
             monitor_task.cancel()
 
-            try:
-                if execution_task:
-                    await execution_task
-                await simulation_task
-                await arbitrage_task
-                await market_data_task
-                await monitor_task
-            except asyncio.CancelledError:
-                pass
+            tasks = [execution_task, simulation_task, arbitrage_task, market_data_task, monitor_task]
+            await asyncio.gather(*(task for task in tasks if task), return_exceptions=True)
+
+            # Stops the executor's background price refresher and closes its shared HTTP session
+            await self.executor.close()
 
             self.running = False
             logger.info("DeFi Arbitrage Trading System stopped")
@@ -168,6 +181,8 @@ class ArbitrageSystem:
         
         logger.info("Stopping DeFi Arbitrage Trading System")
         self.running = False
+        if self._stop_event:
+            self._stop_event.set()
     
     async def _monitor_system(self):
         """Monitor the system and update statistics."""
@@ -181,8 +196,8 @@ class ArbitrageSystem:
                 # Log current system status
                 await self._log_system_status()
                 
-                # Export data for analysis
-                self._export_data()
+                # Export data for analysis, writing the stats file on a worker thread
+                await self._export_data()
                 
                 # Wait before next update
                 await asyncio.sleep(60)  # Update every minute
@@ -190,30 +205,32 @@ class ArbitrageSystem:
                 logger.error(f"Error in system monitoring: {e}")
                 await asyncio.sleep(5)
     
+    def _submit_for_execution(self, trade: Dict):
+        """Queue a trade that passed simulation for execution, while auto-execution is on."""
+        if self.running and self.auto_execute:
+            self.executor.submit(trade)
+    
+    def _record_execution(self, result: Dict):
+        """Fold a finished execution result into the running statistics."""
+        self.stats["trades_executed"] += 1
+        if result.get("status") == "success":
+            self.stats["successful_trades"] += 1
+            self.stats["total_profit_usd"] += result.get("profit_usd", 0)
+            self.stats["total_fees_usd"] += result.get("flashloan_fee", 0)
+            self.stats["total_gas_cost_usd"] += result.get("gas_cost_usd", 0)
+        else:
+            self.stats["failed_trades"] += 1
+    
     async def _update_stats(self):
         """Update system statistics."""
         try:
-            # Get current data
-            opportunities = self.arbitrage_service.get_all_opportunities()
-            simulations = self.simulation_service.get_all_simulations()
-            executions = self.execution_service.get_execution_results()
-            successful = self.execution_service.get_successful_executions()
+            # Update statistics; execution counters and totals are kept current by _record_execution
+            self.stats["opportunities_detected"] = len(self.arbitrage_service.get_all_opportunities())
+            self.stats["trades_simulated"] = len(self.simulation_service.get_all_simulations())
             
-            # Update statistics
-            self.stats["opportunities_detected"] = len(opportunities)
-            self.stats["trades_simulated"] = len(simulations)
-            self.stats["trades_executed"] = len(executions)
-            self.stats["successful_trades"] = len(successful)
-            self.stats["failed_trades"] = len(executions) - len(successful)
-            
-            # Calculate financial metrics
-            total_profit = sum(trade.get("profit_usd", 0) for trade in successful)
-            total_fees = sum(trade.get("flashloan_fee", 0) for trade in successful)
-            total_gas = sum(trade.get("gas_cost_usd", 0) for trade in successful)
-            
-            self.stats["total_profit_usd"] = total_profit
-            self.stats["total_fees_usd"] = total_fees
-            self.stats["total_gas_cost_usd"] = total_gas
+            executed = self.stats["trades_executed"]
+            successful = self.stats["successful_trades"]
+            total_profit = self.stats["total_profit_usd"]
             
             # Calculate runtime
             runtime = time.time() - self.system_start_time
@@ -221,54 +238,88 @@ class ArbitrageSystem:
             
             # Calculate performance metrics
             if runtime > 0:
-                self.stats["opportunities_per_hour"] = opportunities / (runtime / 3600)
+                self.stats["opportunities_per_hour"] = self.stats["opportunities_detected"] / (runtime / 3600)
                 self.stats["profit_per_hour"] = total_profit / (runtime / 3600)
             
-            if len(successful) > 0:
-                self.stats["avg_profit_per_trade"] = total_profit / len(successful)
-                self.stats["avg_gas_cost_per_trade"] = total_gas / len(successful)
+            if successful > 0:
+                self.stats["avg_profit_per_trade"] = total_profit / successful
+                self.stats["avg_gas_cost_per_trade"] = self.stats["total_gas_cost_usd"] / successful
             
-            if len(executions) > 0:
-                self.stats["success_rate"] = len(successful) / len(executions)
+            if executed > 0:
+                self.stats["success_rate"] = successful / executed
         except Exception as e:
             logger.error(f"Error updating stats: {e}")
     
     async def _log_system_status(self):
         """Log current system status."""
-        runtime_hours = self.stats.get("runtime_seconds", 0) / 3600
+        if not logger.isEnabledFor(logging.INFO):
+            return
         
-        logger.info(f"System Status (Runtime: {runtime_hours:.2f} hours):")
-        logger.info(f"  Opportunities Detected: {self.stats['opportunities_detected']}")
-        logger.info(f"  Trades Simulated: {self.stats['trades_simulated']}")
-        logger.info(f"  Trades Executed: {self.stats['trades_executed']}")
-        logger.info(f"  Successful Trades: {self.stats['successful_trades']}")
-        logger.info(f"  Failed Trades: {self.stats['failed_trades']}")
-        logger.info(f"  Total Profit: ${self.stats['total_profit_usd']:.2f}")
-        logger.info(f"  Total Fees: ${self.stats['total_fees_usd']:.2f}")
-        logger.info(f"  Total Gas Cost: ${self.stats['total_gas_cost_usd']:.2f}")
+        s = self.stats
+        lines = [
+            "System Status (Runtime: %.2f hours):",
+            "  Opportunities Detected: %s",
+            "  Trades Simulated: %s",
+            "  Trades Executed: %s",
+            "  Successful Trades: %s",
+            "  Failed Trades: %s",
+            "  Total Profit: $%.2f",
+            "  Total Fees: $%.2f",
+            "  Total Gas Cost: $%.2f",
+        ]
+        values = [
+            s.get("runtime_seconds", 0) / 3600,
+            s["opportunities_detected"],
+            s["trades_simulated"],
+            s["trades_executed"],
+            s["successful_trades"],
+            s["failed_trades"],
+            s["total_profit_usd"],
+            s["total_fees_usd"],
+            s["total_gas_cost_usd"],
+        ]
         
-        if "avg_profit_per_trade" in self.stats:
-            logger.info(f"  Avg Profit per Trade: ${self.stats['avg_profit_per_trade']:.2f}")
+        if "avg_profit_per_trade" in s:
+            lines.append("  Avg Profit per Trade: $%.2f")
+            values.append(s["avg_profit_per_trade"])
         
-        if "success_rate" in self.stats:
-            logger.info(f"  Success Rate: {self.stats['success_rate']:.2%}")
+        if "success_rate" in s:
+            lines.append("  Success Rate: %.2f%%")
+            values.append(s["success_rate"] * 100)
+        
+        # One record for the whole status block, rather than one handler call per line
+        logger.info("\n".join(lines), *values)
     
-    def _export_data(self):
+    async def _export_data(self):
         """Export system data for analysis."""
-        os.makedirs("data", exist_ok=True)
-        
-        # Export system statistics
-        with open(os.path.join("data", "system_stats.json"), "w") as f:
-            json.dump(self.stats, f, indent=2)
-        
-        # Export data from each service
-        self.market_data.export_data()
-        self.arbitrage_service.export_opportunities()
-        self.simulation_service.export_simulations()
-        self.execution_service.export_execution_results()
+        # The service exports read state the services mutate on the event loop, so they run on the
+        # loop; only the stats file is written on a worker thread, from a snapshot taken here
+        dump = asyncio.create_task(asyncio.to_thread(self._dump_stats, dict(self.stats)))
+        exports = (
+            ("market data", self.market_data.export_data),
+            ("opportunities", self.arbitrage_service.export_opportunities),
+            ("simulations", self.simulation_service.export_simulations),
+            ("execution results", self.execution_service.export_execution_results),
+        )
+        for name, export in exports:
+            try:
+                export()
+            except Exception as e:
+                logger.error("Error exporting %s: %s", name, e)
+        try:
+            await dump
+        except Exception as e:
+            logger.error("Error writing system stats: %s", e)
         
         logger.info("Exported system data for analysis")
     
+    def _dump_stats(self, stats: Dict):
+        """Write a snapshot of the system statistics to disk."""
+        # Write to a temporary file and swap it in, so readers never see a half-written file
+        tmp_path = self._stats_path.with_suffix(".tmp")
+        tmp_path.write_bytes(orjson.dumps(stats, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, self._stats_path)
+    
     def get_system_stats(self) -> Dict:
         """Get current system statistics."""
         return self.stats
@@ -1,31 +1,381 @@
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 import asyncio
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
 import time
+from collections import namedtuple
+from operator import itemgetter
 
-from config.config import MIN_PROFIT_THRESHOLD
+import numpy as np
+import pandas as pd
+from numba import njit
+
+from config.config import MIN_PROFIT_THRESHOLD, MIN_POOL_LIQUIDITY
 from market_data.collector import MarketDataCollector
+from market_data.multicall import MulticallQuoteManager
 from simulator import TradeSimulator
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("market_data.analyzer")
 
+# The triangle scan runs on float32 log prices and fees, whose rounding can shift a
+# triangle's net profit by ~1e-6. It screens against a threshold lowered by this
+# slack so no true positive is lost, and survivors are confirmed in float64.
+FLOAT32_SCREEN_SLACK = 1e-5
+
+# Token graphs with fewer edges than this are searched on a thread in this process,
+# since pickling them to a worker process would cost more than the scan itself
+PROCESS_POOL_MIN_EDGES = 5000
+
+# Per-edge details of a token graph, kept as a tuple to avoid a dict per edge
+EdgeInfo = namedtuple("EdgeInfo", "price pool_id fee")
+
+
+def _intern(ids: Dict[str, int], names: List[str], name: str) -> int:
+    """Return the integer id of `name`, assigning the next free id on first sight."""
+    i = ids.get(name)
+    if i is None:
+        i = ids[name] = len(names)
+        names.append(name)
+    return i
+
+
+def _pair_key(token_a: int, token_b: int) -> int:
+    """Pack two token ids into one orientation-independent pair key."""
+    if token_a > token_b:
+        token_a, token_b = token_b, token_a
+    return (token_a << 32) | token_b
+
+
+def build_pool_soa(
+    all_pools: Dict[str, List[Dict]],
+    symbol_ids: Optional[Dict[str, int]] = None,
+    symbols: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Flatten the pool snapshot into struct-of-arrays columns.
+    
+    Uniswap-like pools contribute one row each and Curve-like pools one row per
+    coin paired with the pool's first coin, with the pair's balances stored as
+    reserve0/reserve1. Token, DEX and network names are interned to small integer
+    ids. The same pass records each pool's state fingerprint and the token pairs it
+    prices, which drive incremental re-analysis.
+    
+    Args:
+        all_pools: Pool lists keyed by "<dex>_<network>".
+        symbol_ids: Symbol-to-id table to intern tokens into. Passing the same table
+            and `symbols` list across calls keeps token ids stable between snapshots.
+        symbols: Id-to-symbol list matching `symbol_ids`.
+    
+    Returns:
+        Dict[str, Any]: The columns `reserve0`, `reserve1`, `reserve_usd`, `fee`, `token0`,
+            `token1`, `dex`, `network`, `multi_asset` and `pool_id`, the `symbols`, `dexes`
+            and `networks` lookup lists for mapping ids back to names, and the
+            `pool_states` and `pool_pairs` dicts keyed by ("<dex>_<network>", pool id).
+    """
+    if symbol_ids is None or symbols is None:
+        symbol_ids, symbols = {}, []
+    dex_ids, dexes = {}, []
+    network_ids, networks = {}, []
+    reserve0, reserve1, reserve_usd, fee = [], [], [], []
+    token0, token1, dex, network = [], [], [], []
+    multi_asset, pool_id = [], []
+    pool_states, pool_pairs = {}, {}
+    
+    for key, pools in all_pools.items():
+        # Network ids never contain an underscore, so the last one separates the DEX id
+        dex_name, network_name = key.rsplit("_", 1)
+        d = _intern(dex_ids, dexes, dex_name)
+        n = _intern(network_ids, networks, network_name)
+        
+        for pool in pools:
+            # For Uniswap-like pools
+            if "token0" in pool and "token1" in pool and "reserve0" in pool and "reserve1" in pool:
+                reserve0.append(pool["reserve0"])
+                reserve1.append(pool["reserve1"])
+                reserve_usd.append(pool.get("reserveUSD", np.nan))
+                fee.append(pool.get("feeTier", 0.003))  # Default to 0.3% if not specified
+                token0.append(_intern(symbol_ids, symbols, pool["token0"]["symbol"]))
+                token1.append(_intern(symbol_ids, symbols, pool["token1"]["symbol"]))
+                dex.append(d)
+                network.append(n)
+                multi_asset.append(False)
+                pool_id.append(pool["id"])
+                
+                pool_key = (key, pool["id"])
+                pool_states[pool_key] = hash((pool["reserve0"], pool["reserve1"], pool.get("reserveUSD")))
+                pool_pairs[pool_key] = (_pair_key(token0[-1], token1[-1]),)
+            
+            # For Curve-like pools (multi-token)
+            elif "coins" in pool and "balances" in pool:
+                # Curve pools are more complex, but we can still extract some price information.
+                # Every coin is priced against the first one, which gives k-1 independent pair
+                # observations instead of all k(k-1)/2 redundant ones.
+                coins = pool["coins"]
+                balances = pool["balances"]
+                pivot = _intern(symbol_ids, symbols, coins[0]["symbol"])
+                pairs = []
+                
+                for j in range(1, len(coins)):
+                    reserve0.append(balances[0])
+                    reserve1.append(balances[j])
+                    reserve_usd.append(pool.get("reserveUSD", np.nan))
+                    fee.append(pool.get("fee", 0.0004))  # Default to 0.04% if not specified
+                    token0.append(pivot)
+                    token1.append(_intern(symbol_ids, symbols, coins[j]["symbol"]))
+                    dex.append(d)
+                    network.append(n)
+                    multi_asset.append(True)
+                    pool_id.append(pool["id"])
+                    pairs.append(_pair_key(pivot, token1[-1]))
+                
+                pool_key = (key, pool["id"])
+                pool_states[pool_key] = hash((tuple(balances), pool.get("reserveUSD")))
+                pool_pairs[pool_key] = tuple(pairs)
+    
+    return {
+        "reserve0": np.asarray(reserve0, dtype=np.float64),
+        "reserve1": np.asarray(reserve1, dtype=np.float64),
+        "reserve_usd": np.asarray(reserve_usd, dtype=np.float64),
+        "fee": np.asarray(fee, dtype=np.float64),
+        "token0": np.asarray(token0, dtype=np.uint32),
+        "token1": np.asarray(token1, dtype=np.uint32),
+        "dex": np.asarray(dex, dtype=np.int16),
+        "network": np.asarray(network, dtype=np.int16),
+        "multi_asset": np.asarray(multi_asset, dtype=np.bool_),
+        "pool_id": np.asarray(pool_id, dtype=object),
+        "symbols": symbols,
+        "dexes": dexes,
+        "networks": networks,
+        "pool_states": pool_states,
+        "pool_pairs": pool_pairs,
+    }
+
+
+def two_core_mask(token0: np.ndarray, token1: np.ndarray) -> np.ndarray:
+    """
+    Select the pools that lie in the 2-core of the token graph.
+    
+    A token with fewer than two distinct neighbours cannot be on a cycle, so such tokens
+    and their pools are peeled off repeatedly until every remaining token has at least two.
+    
+    Returns:
+        np.ndarray: Boolean mask over the given pools.
+    """
+    token0 = token0.astype(np.int64)
+    token1 = token1.astype(np.int64)
+    keep = token0 != token1
+    n_tokens = int(max(token0.max(initial=-1), token1.max(initial=-1))) + 1
+    
+    while keep.any():
+        # Degree counts distinct neighbours, so parallel pools between two tokens count once
+        lo = np.minimum(token0[keep], token1[keep])
+        hi = np.maximum(token0[keep], token1[keep])
+        links = np.unique(lo * n_tokens + hi)
+        degree = np.bincount(links // n_tokens, minlength=n_tokens) + np.bincount(links % n_tokens, minlength=n_tokens)
+        
+        peel = keep & ((degree[token0] < 2) | (degree[token1] < 2))
+        if not peel.any():
+            break
+        keep &= ~peel
+    
+    return keep
+
+
+def build_log_graph(pools_soa: Dict[str, Any], rows: np.ndarray) -> Tuple[List[str], np.ndarray, List[EdgeInfo]]:
+    """
+    Build a log-transformed edge list of a DEX's pools for cycle detection.
+    
+    Each of the given `build_pool_soa` rows contributes one edge per swap direction
+    weighted -log(price * (1 - fee)), so a cycle with negative total weight is a
+    round trip whose fee-adjusted rate exceeds 1.
+    
+    Returns:
+        Tuple[List[str], np.ndarray, List[EdgeInfo]]: The token symbols indexed by node id,
+            an (E, 3) array of (src_idx, dst_idx, weight) rows, and per-edge price,
+            pool and fee records.
+    """
+    reserve0 = pools_soa["reserve0"][rows]
+    reserve1 = pools_soa["reserve1"][rows]
+    rows = rows[(reserve0 > 0) & (reserve1 > 0)]
+    
+    reserve0 = pools_soa["reserve0"][rows]
+    reserve1 = pools_soa["reserve1"][rows]
+    fee = pools_soa["fee"][rows]
+    pool_id = pools_soa["pool_id"][rows]
+    
+    # Both swap directions of every pool, forward edges first
+    price = np.concatenate([reserve1 / reserve0, reserve0 / reserve1])
+    fee = np.concatenate([fee, fee])
+    pool_id = np.concatenate([pool_id, pool_id])
+    token_in = np.concatenate([pools_soa["token0"][rows], pools_soa["token1"][rows]])
+    token_out = np.concatenate([pools_soa["token1"][rows], pools_soa["token0"][rows]])
+    
+    # Renumber the DEX's tokens densely so node ids run from 0 to V-1
+    node_symbols, nodes = np.unique(np.concatenate([token_in, token_out]), return_inverse=True)
+    n_edges = len(price)
+    
+    edges = np.empty((n_edges, 3), dtype=np.float64)
+    edges[:, 0] = nodes[:n_edges]
+    edges[:, 1] = nodes[n_edges:]
+    edges[:, 2] = -np.log(price) - np.log1p(-fee)
+    
+    tokens = [pools_soa["symbols"][i] for i in node_symbols]
+    edge_info = [EdgeInfo(*info) for info in zip(price.tolist(), pool_id.tolist(), fee.tolist())]
+    return tokens, edges, edge_info
+
+
+def build_csr(n_nodes: int, edges: np.ndarray, edge_info: List[EdgeInfo]) -> Tuple[np.ndarray, ...]:
+    """
+    Convert a `build_log_graph` edge list into CSR adjacency arrays.
+    
+    Returns:
+        Tuple[np.ndarray, ...]: (indptr, neighbors, log_w, fee_w, edge_ids), where the
+            out-edges of node u are positions indptr[u]:indptr[u + 1], log_w holds
+            log(price) as float32, and edge_ids maps each position back to its original edge.
+    """
+    src = edges[:, 0].astype(np.int64)
+    edge_ids = np.argsort(src, kind="stable")
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n_nodes), out=indptr[1:])
+    neighbors = edges[edge_ids, 1].astype(np.int64)
+    price = np.fromiter((info.price for info in edge_info), dtype=np.float64, count=len(edge_info))
+    fee = np.fromiter((info.fee for info in edge_info), dtype=np.float64, count=len(edge_info))
+    log_w = np.log(price)[edge_ids].astype(np.float32)
+    fee_w = fee[edge_ids].astype(np.float32)
+    return indptr, neighbors, log_w, fee_w, edge_ids
+
+
+# Compiled eagerly for the CSR dtypes built above, so the first analysis pass does not
+# pay the JIT warmup; later processes load the machine code from Numba's on-disk cache
+@njit(
+    "int64(int64[::1], int64[::1], float32[::1], float32[::1], float64, float64,"
+    " int64[::1], int64[::1], int64[::1], float64[::1])",
+    cache=True, nogil=True
+)
+def scan_triangles(indptr, neighbors, log_w, fee_w, threshold, gas, out_a, out_b, out_c, out_profit):
+    """
+    Enumerate every directed 3-cycle whose net profit clears `threshold`.
+    
+    Each cycle is reported once, starting from its lowest node id. Matches are written
+    as CSR positions into the output arrays until they are full; the returned count
+    includes matches that did not fit so the caller can retry with larger buffers.
+    """
+    count = 0
+    n_nodes = indptr.shape[0] - 1
+    
+    # A triangle pays at least three times the cheapest fee, so its summed log price
+    # must clear this floor before the exact check is worth an exp
+    min_fee = fee_w.min() if fee_w.shape[0] > 0 else 0.0
+    log_floor = math.log1p(threshold + gas + 3.0 * min_fee)
+    
+    for a in range(n_nodes):
+        for e_ab in range(indptr[a], indptr[a + 1]):
+            b = neighbors[e_ab]
+            if b < a:
+                continue
+            for e_bc in range(indptr[b], indptr[b + 1]):
+                c = neighbors[e_bc]
+                if c <= a:
+                    continue
+                for e_ca in range(indptr[c], indptr[c + 1]):
+                    if neighbors[e_ca] != a:
+                        continue
+                    logsum = np.float64(log_w[e_ab]) + log_w[e_bc] + log_w[e_ca]
+                    if logsum < log_floor:
+                        continue
+                    feesum = np.float64(fee_w[e_ab]) + fee_w[e_bc] + fee_w[e_ca]
+                    net_profit = math.exp(logsum) - 1.0 - feesum - gas
+                    if net_profit >= threshold:
+                        if count < out_a.shape[0]:
+                            out_a[count] = e_ab
+                            out_b[count] = e_bc
+                            out_c[count] = e_ca
+                            out_profit[count] = net_profit
+                        count += 1
+    return count
+
+
+def find_profitable_triangles(n_nodes: int, edges: np.ndarray, edge_info: List[EdgeInfo],
+                              min_profit: float, gas_cost_pct: float) -> List[List[int]]:
+    """
+    Find all profitable three-leg cycles in a graph built by `build_log_graph`.
+    
+    Returns:
+        List[List[int]]: Each profitable triangle as edge indices in traversal order.
+    """
+    indptr, neighbors, log_w, fee_w, edge_ids = build_csr(n_nodes, edges, edge_info)
+    
+    capacity = max(16, n_nodes)
+    while True:
+        out_a = np.empty(capacity, dtype=np.int64)
+        out_b = np.empty(capacity, dtype=np.int64)
+        out_c = np.empty(capacity, dtype=np.int64)
+        out_profit = np.empty(capacity, dtype=np.float64)
+        count = scan_triangles(indptr, neighbors, log_w, fee_w, min_profit - FLOAT32_SCREEN_SLACK,
+                               gas_cost_pct, out_a, out_b, out_c, out_profit)
+        if count <= capacity:
+            break
+        capacity = count
+    
+    # The float32 scan is a slightly loose screen; confirm its candidates in float64
+    triangles = []
+    for i in range(count):
+        cycle = [int(edge_ids[out_a[i]]), int(edge_ids[out_b[i]]), int(edge_ids[out_c[i]])]
+        edge_ab, edge_bc, edge_ca = (edge_info[e] for e in cycle)
+        round_trip_rate = edge_ab.price * edge_bc.price * edge_ca.price
+        net_profit = round_trip_rate - 1 - (edge_ab.fee + edge_bc.fee + edge_ca.fee) - gas_cost_pct
+        if net_profit >= min_profit:
+            triangles.append(cycle)
+    return triangles
+
 class PriceAnalyzer:
     """
     Analyzes price data to identify arbitrage opportunities across DEXs and networks.
     """
     
-    def __init__(self, data_collector: MarketDataCollector):
-        """Initialize the price analyzer with a market data collector."""
+    def __init__(self, data_collector: MarketDataCollector, quote_manager: Optional[MulticallQuoteManager] = None):
+        """
+        Initialize the price analyzer with a market data collector.
+        
+        Args:
+            data_collector: Source of the pool snapshot.
+            quote_manager: If given, pool reserves are re-read on-chain through
+                Multicall3 before every analysis pass.
+        """
         self.data_collector = data_collector
+        self.quote_manager = quote_manager
         self.price_discrepancies = []
         self.last_analysis = 0
         self.analysis_interval = 30  # seconds
         self.trade_simulator = TradeSimulator()
+        
+        # Per-pool state fingerprints and token pair keys of the last analyzed snapshot,
+        # keyed by ("<dex>_<network>", pool id)
+        self._pool_states: Dict[Tuple[str, str], int] = {}
+        self._pool_pairs: Dict[Tuple[str, str], Tuple[int, ...]] = {}
+        
+        # Token symbols are interned once and keep their ids across analysis passes
+        self._sym_ids: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        
+        # Worker processes for the CPU-bound triangle search of large DEXs, started on first use
+        self.max_workers = min(4, os.cpu_count() or 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the triangle search process pool, starting it on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+    
+    def close(self):
+        """Shut down the triangle search worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
     
     async def analyze_prices(self):
         """Analyze prices across DEXs and networks to identify arbitrage opportunities."""
@@ -38,264 +388,348 @@ class PriceAnalyzer:
         await self.data_collector.update_market_data()
         
         try:
-            # Clear previous discrepancies
-            self.price_discrepancies = []
-            
             # Get all liquidity pools
             all_pools = self.data_collector.get_all_liquidity_pools()
+            if self.quote_manager is not None:
+                all_pools = await self._refresh_reserves(all_pools)
+            
+            # Flatten the pools in a single pass into columns shared by both analyses
+            pools_soa = build_pool_soa(all_pools, self._sym_ids, self._symbols)
+            
+            # Find the pools that changed, appeared or disappeared since the last analysis
+            pool_states = pools_soa["pool_states"]
+            changed_pools = {
+                pool_key for pool_key, state in pool_states.items()
+                if self._pool_states.get(pool_key) != state
+            }
+            changed_pools.update(self._pool_states.keys() - pool_states.keys())
             
-            # Analyze price discrepancies across DEXs and networks
-            await self.analyze_cross_dex_opportunities(all_pools)
+            # Unchanged pools yield unchanged opportunities, so keep the previous results
+            if not changed_pools:
+                logger.debug("Skipping analysis, no change in liquidity pools since last analysis")
+                self.last_analysis = current_time
+                return
             
-            # Analyze triangular arbitrage opportunities
-            await self.analyze_triangular_opportunities(all_pools)
+            # Only token pairs and DEXs touched by a changed pool need to be re-evaluated
+            pool_pairs = pools_soa["pool_pairs"]
+            dirty_pairs: Set[int] = set()
+            dirty_dexes: Set[str] = set()
+            for pool_key in changed_pools:
+                dirty_pairs.update(pool_pairs.get(pool_key, ()))
+                dirty_pairs.update(self._pool_pairs.get(pool_key, ()))
+                dirty_dexes.add(pool_key[0])
+            
+            # Drop the previous opportunities that are about to be re-evaluated
+            self.price_discrepancies = [
+                opportunity for opportunity in self.price_discrepancies
+                if not self._is_dirty(opportunity, dirty_pairs, dirty_dexes)
+            ]
+            
+            # Analyze cross-DEX and triangular opportunities concurrently; each
+            # analysis collects into its own list to avoid interleaved appends
+            cross_dex_opportunities, triangular_opportunities = await asyncio.gather(
+                self.analyze_cross_dex_opportunities(pools_soa, dirty_pairs),
+                self.analyze_triangular_opportunities(pools_soa, dirty_dexes)
+            )
+            self.price_discrepancies.extend(cross_dex_opportunities + triangular_opportunities)
             
             self.last_analysis = current_time
-            logger.info(f"Price analysis completed, found {len(self.price_discrepancies)} potential opportunities")
+            self._pool_states = pool_states
+            self._pool_pairs = pool_pairs
+            logger.info("Price analysis completed, found %d potential opportunities", len(self.price_discrepancies))
         except Exception as e:
-            logger.error(f"Error analyzing prices: {e}")
+            logger.error("Error analyzing prices: %s", e)
     
-    async def analyze_cross_dex_opportunities(self, all_pools: Dict[str, List[Dict]]):
-        """Analyze price discrepancies for the same token pair across different DEXs."""
-        # Create a mapping of token pairs to their prices across different DEXs
-        pair_prices = {}
+    async def _refresh_reserves(self, all_pools: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        Re-read the reserves of Uniswap-like pools with one batched Multicall3 call per network.
         
-        # Iterate through all pools and extract price information
+        Pools whose read failed are dropped from the snapshot. Networks that failed or
+        timed out as a whole keep the collector's values, as do Curve-like pools.
+        """
+        by_network: Dict[str, List[Dict]] = {}
         for key, pools in all_pools.items():
-            dex_id, network_id = key.split("_")
+            network_id = key.rsplit("_", 1)[1]
+            by_network.setdefault(network_id, []).extend(pool for pool in pools if "token0" in pool)
+        
+        refreshed = await self.quote_manager.refresh_pools(by_network)
+        live = {id(pool) for pools in refreshed.values() for pool in pools}
+        
+        snapshot = {}
+        for key, pools in all_pools.items():
+            if key.rsplit("_", 1)[1] in refreshed:
+                pools = [pool for pool in pools if "token0" not in pool or id(pool) in live]
+            snapshot[key] = pools
+        return snapshot
+    
+    def _is_dirty(self, opportunity: Dict, dirty_pairs: Set[int], dirty_dexes: Set[str]) -> bool:
+        """Check whether an opportunity depends on a pool that changed."""
+        if opportunity.get("type") == "triangular":
+            return f"{opportunity['dex_id']}_{opportunity['network_id']}" in dirty_dexes
+        
+        token0 = self._sym_ids.get(opportunity.get("token0"), -1)
+        token1 = self._sym_ids.get(opportunity.get("token1"), -1)
+        return _pair_key(token0, token1) in dirty_pairs
+    
+    async def analyze_cross_dex_opportunities(
+        self,
+        pools_soa: Dict[str, Any],
+        dirty_pairs: Optional[Set[int]] = None
+    ) -> List[Dict]:
+        """
+        Analyze price discrepancies for the same token pair across different DEXs.
+        
+        Args:
+            pools_soa: Pool columns from `build_pool_soa`.
+            dirty_pairs: Packed token pair keys to re-evaluate. All pairs if None.
+        """
+        opportunities = []
+        
+        # Pools without reserves have no usable price, and dust pools quote misleading
+        # mid-prices that can never be traded. Pools of unknown USD liquidity are kept.
+        reserve0 = pools_soa["reserve0"]
+        reserve1 = pools_soa["reserve1"]
+        dust = pools_soa["reserve_usd"] < MIN_POOL_LIQUIDITY
+        valid = (reserve0 > 0) & (reserve1 > 0) & ~dust
+        
+        # Packed key for each token pair, the same whichever way round a DEX lists it
+        token0_ids = pools_soa["token0"]
+        token1_ids = pools_soa["token1"]
+        pair_keys = (
+            (np.minimum(token0_ids, token1_ids).astype(np.uint64) << np.uint64(32))
+            | np.maximum(token0_ids, token1_ids)
+        )
+        if dirty_pairs is not None:
+            valid &= np.isin(pair_keys, np.fromiter(dirty_pairs, dtype=np.uint64, count=len(dirty_pairs)))
+        
+        rows = np.flatnonzero(valid)
+        if len(rows) == 0:
+            return opportunities
+        
+        # Quote every pair in alphabetical orientation, inverting reversed listings
+        symbols = pools_soa["symbols"]
+        symbol_rank = np.empty(len(symbols), dtype=np.int64)
+        symbol_rank[np.argsort(np.asarray(symbols, dtype=object))] = np.arange(len(symbols))
+        reversed_listing = symbol_rank[token0_ids[rows]] > symbol_rank[token1_ids[rows]]
+        base_ids = np.where(reversed_listing, token1_ids[rows], token0_ids[rows])
+        quote_ids = np.where(reversed_listing, token0_ids[rows], token1_ids[rows])
+        
+        # Calculate prices (quote token per base token)
+        df = pd.DataFrame({
+            "pair_key": pair_keys[rows],
+            "price": np.where(reversed_listing, reserve0[rows] / reserve1[rows], reserve1[rows] / reserve0[rows]),
+        })
+        
+        # Find the lowest and highest priced pool of every pair with at least two prices
+        grp = df.groupby("pair_key", sort=False)["price"]
+        comparable = grp.size() >= 2
+        lo_idx = grp.idxmin()[comparable]
+        hi_idx = grp.idxmax()[comparable]
+        if lo_idx.empty:
+            return opportunities
+        
+        buy_rows = rows[lo_idx.values]
+        sell_rows = rows[hi_idx.values]
+        
+        # Calculate the price difference percentage
+        buy_price = df["price"].values[lo_idx.values]
+        sell_price = df["price"].values[hi_idx.values]
+        price_diff_pct = sell_price / buy_price - 1
+        
+        # Calculate estimated fees
+        buy_fee = pools_soa["fee"][buy_rows]
+        sell_fee = pools_soa["fee"][sell_rows]
+        
+        # Estimate gas costs (this would be more accurate in a real implementation)
+        estimated_gas_cost_pct = 0.001  # 0.1% as a placeholder
+        
+        # Calculate net profit after fees and gas costs
+        net_profit_pct = price_diff_pct - buy_fee - sell_fee - estimated_gas_cost_pct
+        
+        # Only pairs whose net profit exceeds our threshold are turned into opportunities.
+        # Their columns are gathered in one vectorized pass so the loop below only
+        # touches plain Python values.
+        hits = np.flatnonzero(net_profit_pct >= MIN_PROFIT_THRESHOLD)
+        if len(hits) == 0:
+            return opportunities
+        
+        buy_rows, sell_rows = buy_rows[hits], sell_rows[hits]
+        pair_rows = lo_idx.values[hits]
+        survivors = zip(
+            base_ids[pair_rows].tolist(), quote_ids[pair_rows].tolist(),
+            pools_soa["dex"][buy_rows].tolist(), pools_soa["network"][buy_rows].tolist(),
+            pools_soa["pool_id"][buy_rows].tolist(), buy_price[hits].tolist(), buy_fee[hits].tolist(),
+            pools_soa["dex"][sell_rows].tolist(), pools_soa["network"][sell_rows].tolist(),
+            pools_soa["pool_id"][sell_rows].tolist(), sell_price[hits].tolist(), sell_fee[hits].tolist(),
+            price_diff_pct[hits].tolist(), net_profit_pct[hits].tolist()
+        )
+        
+        dexes, networks = pools_soa["dexes"], pools_soa["networks"]
+        for (token0_id, token1_id, buy_dex_id, buy_network_id, buy_pool, buy_price_i, buy_fee_i,
+             sell_dex_id, sell_network_id, sell_pool, sell_price_i, sell_fee_i,
+             price_diff_pct_i, net_profit_pct_i) in survivors:
+            token0 = symbols[token0_id]
+            token1 = symbols[token1_id]
+            buy_dex = dexes[buy_dex_id]
+            buy_network = networks[buy_network_id]
+            sell_dex = dexes[sell_dex_id]
+            sell_network = networks[sell_network_id]
             
-            for pool in pools:
-                # For Uniswap-like pools
-                if "token0" in pool and "token1" in pool and "reserve0" in pool and "reserve1" in pool:
-                    token0 = pool["token0"]["symbol"]
-                    token1 = pool["token1"]["symbol"]
-                    
-                    # Calculate price (token1 per token0)
-                    price = pool["reserve1"] / pool["reserve0"] if pool["reserve0"] > 0 else 0
-                    
-                    # Create a unique key for this token pair
-                    pair_key = f"{token0}_{token1}"
-                    
-                    # Store price information
-                    if pair_key not in pair_prices:
-                        pair_prices[pair_key] = []
-                    
-                    pair_prices[pair_key].append({
-                        "dex_id": dex_id,
-                        "network_id": network_id,
-                        "pool_id": pool["id"],
-                        "price": price,
-                        "reserve0": pool["reserve0"],
-                        "reserve1": pool["reserve1"],
-                        "reserveUSD": pool.get("reserveUSD", 0),
-                        "fee": pool.get("feeTier", 0.003)  # Default to 0.3% if not specified
-                    })
-                
-                # For Curve-like pools (multi-token)
-                elif "coins" in pool and "balances" in pool:
-                    # Curve pools are more complex, but we can still extract some price information
-                    # For simplicity, we'll just look at pairs of tokens within the pool
-                    coins = pool["coins"]
-                    balances = pool["balances"]
-                    
-                    for i in range(len(coins) - 1):
-                        for j in range(i + 1, len(coins)):
-                            token_i = coins[i]["symbol"]
-                            token_j = coins[j]["symbol"]
-                            
-                            # Calculate price (token_j per token_i)
-                            price = balances[j] / balances[i] if balances[i] > 0 else 0
-                            
-                            # Create a unique key for this token pair
-                            pair_key = f"{token_i}_{token_j}"
-                            
-                            # Store price information
-                            if pair_key not in pair_prices:
-                                pair_prices[pair_key] = []
-                            
-                            pair_prices[pair_key].append({
-                                "dex_id": dex_id,
-                                "network_id": network_id,
-                                "pool_id": pool["id"],
-                                "price": price,
-                                "reserve_i": balances[i],
-                                "reserve_j": balances[j],
-                                "fee": pool.get("fee", 0.0004)  # Default to 0.04% if not specified
-                            })
-        
-        # Analyze price discrepancies for each token pair
-        for pair_key, prices in pair_prices.items():
-            if len(prices) < 2:
-                continue  # Need at least two prices to compare
+            opportunity = {
+                "type": "cross_dex",
+                "token_pair": f"{token0}_{token1}",
+                "token0": token0,
+                "token1": token1,
+                "buy_dex": buy_dex,
+                "buy_network": buy_network,
+                "buy_pool": buy_pool,
+                "buy_price": buy_price_i,
+                "sell_dex": sell_dex,
+                "sell_network": sell_network,
+                "sell_pool": sell_pool,
+                "sell_price": sell_price_i,
+                "price_diff_pct": price_diff_pct_i,
+                "buy_fee": buy_fee_i,
+                "sell_fee": sell_fee_i,
+                "estimated_gas_cost_pct": estimated_gas_cost_pct,
+                "net_profit_pct": net_profit_pct_i,
+                "timestamp": time.time()
+            }
             
-            # Find the lowest and highest prices
-            lowest_price = min(prices, key=lambda x: x["price"])
-            highest_price = max(prices, key=lambda x: x["price"])
+            # Simulate the trade
+            is_profitable, simulation_result = await self.trade_simulator.simulate_trade(opportunity)
             
-            # Calculate the price difference percentage
-            price_diff_pct = (highest_price["price"] - lowest_price["price"]) / lowest_price["price"]
+            # Only add the opportunity if it's still profitable after simulation
+            if is_profitable:
+                opportunities.append(simulation_result)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Found cross-DEX opportunity: %s/%s - Buy on %s (%s), Sell on %s (%s), Net profit: %.2f%%",
+                                token0, token1, buy_dex, buy_network, sell_dex, sell_network,
+                                simulation_result["adjusted_net_profit_pct"] * 100)
+        
+        return opportunities
+    
+    async def analyze_triangular_opportunities(
+        self,
+        pools_soa: Dict[str, Any],
+        dirty_dexes: Optional[Set[str]] = None
+    ) -> List[Dict]:
+        """
+        Analyze triangular arbitrage opportunities within a single DEX.
+        
+        Args:
+            pools_soa: Pool columns from `build_pool_soa`.
+            dirty_dexes: "<dex>_<network>" keys to re-evaluate. All DEXs if None.
+        """
+        opportunities = []
+        
+        # Estimate gas costs
+        estimated_gas_cost_pct = 0.002  # 0.2% as a placeholder for 3 transactions
+        
+        # Only Uniswap-like pools form the token graph
+        group_key = (pools_soa["dex"].astype(np.int32) << 16) | pools_soa["network"]
+        
+        # Build the token graph of each DEX and network combination
+        graphs = []
+        for key in np.unique(group_key):
+            rows = np.flatnonzero((group_key == key) & ~pools_soa["multi_asset"])
+            dex_id = pools_soa["dexes"][key >> 16]
+            network_id = pools_soa["networks"][key & 0xFFFF]
             
-            # Calculate estimated fees
-            buy_fee = lowest_price["fee"]
-            sell_fee = highest_price["fee"]
+            # Skip if none of the DEX's pools changed since the last analysis
+            if dirty_dexes is not None and f"{dex_id}_{network_id}" not in dirty_dexes:
+                continue
             
-            # Estimate gas costs (this would be more accurate in a real implementation)
-            estimated_gas_cost_pct = 0.001  # 0.1% as a placeholder
+            # Tokens outside the 2-core can never close a triangle
+            rows = rows[two_core_mask(pools_soa["token0"][rows], pools_soa["token1"][rows])]
             
-            # Calculate net profit after fees and gas costs
-            net_profit_pct = price_diff_pct - buy_fee - sell_fee - estimated_gas_cost_pct
+            # Skip if there are not enough pools for triangular arbitrage
+            if len(rows) < 3:
+                continue
             
-            # If the net profit exceeds our threshold, record this opportunity
-            if net_profit_pct >= MIN_PROFIT_THRESHOLD:
-                token0, token1 = pair_key.split("_")
+            # Build the log-weighted token graph
+            tokens, edges, edge_info = build_log_graph(pools_soa, rows)
+            if len(tokens) >= 3:
+                graphs.append((dex_id, network_id, tokens, edges, edge_info))
+        
+        # Find profitable triangles off the event loop, so the search overlaps with the
+        # cross-DEX analysis. Large DEXs are searched in worker processes, small ones on a
+        # thread, where the GIL-free kernel runs without the cost of pickling the graph.
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(
+                self._get_executor() if len(edges) >= PROCESS_POOL_MIN_EDGES else None,
+                find_profitable_triangles, len(tokens), edges, edge_info,
+                MIN_PROFIT_THRESHOLD, estimated_gas_cost_pct
+            )
+            for _, _, tokens, edges, edge_info in graphs
+        ))
+        
+        for (dex_id, network_id, tokens, edges, edge_info), cycles in zip(graphs, results):
+            for cycle in cycles:
+                edge_ab, edge_bc, edge_ca = (edge_info[e] for e in cycle)
+                token_a = tokens[int(edges[cycle[0], 0])]
+                token_b = tokens[int(edges[cycle[1], 0])]
+                token_c = tokens[int(edges[cycle[2], 0])]
                 
-                opportunity = {
-                    "type": "cross_dex",
-                    "token_pair": pair_key,
-                    "token0": token0,
-                    "token1": token1,
-                    "buy_dex": lowest_price["dex_id"],
-                    "buy_network": lowest_price["network_id"],
-                    "buy_pool": lowest_price["pool_id"],
-                    "buy_price": lowest_price["price"],
-                    "sell_dex": highest_price["dex_id"],
-                    "sell_network": highest_price["network_id"],
-                    "sell_pool": highest_price["pool_id"],
-                    "sell_price": highest_price["price"],
-                    "price_diff_pct": price_diff_pct,
-                    "buy_fee": buy_fee,
-                    "sell_fee": sell_fee,
-                    "estimated_gas_cost_pct": estimated_gas_cost_pct,
-                    "net_profit_pct": net_profit_pct,
-                    "timestamp": time.time()
-                }
+                # Calculate the product of prices
+                price_a_to_b = edge_ab.price
+                price_b_to_c = edge_bc.price
+                price_c_to_a = edge_ca.price
                 
-                # Simulate the trade
-                is_profitable, simulation_result = await self.trade_simulator.simulate_trade(opportunity)
+                # Calculate the round-trip rate
+                round_trip_rate = price_a_to_b * price_b_to_c * price_c_to_a
                 
-                # Only add the opportunity if it's still profitable after simulation
-                if is_profitable:
-                    self.price_discrepancies.append(simulation_result)
-                    logger.info(f"Found cross-DEX opportunity: {token0}/{token1} - Buy on {lowest_price['dex_id']} ({lowest_price['network_id']}), "
-                               f"Sell on {highest_price['dex_id']} ({highest_price['network_id']}), Net profit: {simulation_result['adjusted_net_profit_pct']:.2%}")
-    
-    async def analyze_triangular_opportunities(self, all_pools: Dict[str, List[Dict]]):
-        """Analyze triangular arbitrage opportunities within a single DEX."""
-        # For each DEX and network combination
-        for key, pools in all_pools.items():
-            dex_id, network_id = key.split("_")
-            
-            # Skip if there are not enough pools for triangular arbitrage
-            if len(pools) < 3:
-                continue
-            
-            # Create a mapping of tokens to their connected tokens and prices
-            token_graph = {}
-            
-            # Build the token graph
-            for pool in pools:
-                # For Uniswap-like pools
-                if "token0" in pool and "token1" in pool and "reserve0" in pool and "reserve1" in pool:
-                    token0 = pool["token0"]["symbol"]
-                    token1 = pool["token1"]["symbol"]
-                    
-                    # Calculate prices in both directions
-                    price_0_to_1 = pool["reserve1"] / pool["reserve0"] if pool["reserve0"] > 0 else 0
-                    price_1_to_0 = pool["reserve0"] / pool["reserve1"] if pool["reserve1"] > 0 else 0
-                    
-                    # Add to token graph
-                    if token0 not in token_graph:
-                        token_graph[token0] = {}
-                    if token1 not in token_graph:
-                        token_graph[token1] = {}
-                    
-                    token_graph[token0][token1] = {
-                        "price": price_0_to_1,
-                        "pool_id": pool["id"],
-                        "fee": pool.get("feeTier", 0.003)
+                # Calculate fees
+                total_fee = edge_ab.fee + edge_bc.fee + edge_ca.fee
+                
+                # Calculate net profit
+                net_profit_pct = round_trip_rate - 1 - total_fee - estimated_gas_cost_pct
+                
+                # If the net profit exceeds our threshold, record this opportunity
+                if net_profit_pct >= MIN_PROFIT_THRESHOLD:
+                    opportunity = {
+                        "type": "triangular",
+                        "dex_id": dex_id,
+                        "network_id": network_id,
+                        "token_a": token_a,
+                        "token_b": token_b,
+                        "token_c": token_c,
+                        "price_a_to_b": price_a_to_b,
+                        "price_b_to_c": price_b_to_c,
+                        "price_c_to_a": price_c_to_a,
+                        "round_trip_rate": round_trip_rate,
+                        "pool_a_to_b": edge_ab.pool_id,
+                        "pool_b_to_c": edge_bc.pool_id,
+                        "pool_c_to_a": edge_ca.pool_id,
+                        "total_fee": total_fee,
+                        "estimated_gas_cost_pct": estimated_gas_cost_pct,
+                        "net_profit_pct": net_profit_pct,
+                        "timestamp": time.time()
                     }
                     
-                    token_graph[token1][token0] = {
-                        "price": price_1_to_0,
-                        "pool_id": pool["id"],
-                        "fee": pool.get("feeTier", 0.003)
-                    }
-            
-            # Look for triangular arbitrage opportunities
-            for token_a in token_graph:
-                for token_b in token_graph.get(token_a, {}):
-                    for token_c in token_graph.get(token_b, {}):
-                        # Check if we can complete the triangle
-                        if token_c in token_graph and token_a in token_graph.get(token_c, {}):
-                            # Calculate the product of prices
-                            price_a_to_b = token_graph[token_a][token_b]["price"]
-                            price_b_to_c = token_graph[token_b][token_c]["price"]
-                            price_c_to_a = token_graph[token_c][token_a]["price"]
-                            
-                            # Calculate the round-trip rate
-                            round_trip_rate = price_a_to_b * price_b_to_c * price_c_to_a
-                            
-                            # Calculate fees
-                            fee_a_to_b = token_graph[token_a][token_b]["fee"]
-                            fee_b_to_c = token_graph[token_b][token_c]["fee"]
-                            fee_c_to_a = token_graph[token_c][token_a]["fee"]
-                            total_fee = fee_a_to_b + fee_b_to_c + fee_c_to_a
-                            
-                            # Estimate gas costs
-                            estimated_gas_cost_pct = 0.002  # 0.2% as a placeholder for 3 transactions
-                            
-                            # Calculate net profit
-                            net_profit_pct = round_trip_rate - 1 - total_fee - estimated_gas_cost_pct
-                            
-                            # If the net profit exceeds our threshold, record this opportunity
-                            if net_profit_pct >= MIN_PROFIT_THRESHOLD:
-                                opportunity = {
-                                    "type": "triangular",
-                                    "dex_id": dex_id,
-                                    "network_id": network_id,
-                                    "token_a": token_a,
-                                    "token_b": token_b,
-                                    "token_c": token_c,
-                                    "price_a_to_b": price_a_to_b,
-                                    "price_b_to_c": price_b_to_c,
-                                    "price_c_to_a": price_c_to_a,
-                                    "round_trip_rate": round_trip_rate,
-                                    "pool_a_to_b": token_graph[token_a][token_b]["pool_id"],
-                                    "pool_b_to_c": token_graph[token_b][token_c]["pool_id"],
-                                    "pool_c_to_a": token_graph[token_c][token_a]["pool_id"],
-                                    "total_fee": total_fee,
-                                    "estimated_gas_cost_pct": estimated_gas_cost_pct,
-                                    "net_profit_pct": net_profit_pct,
-                                    "timestamp": time.time()
-                                }
-                                
-                                # Simulate the trade
-                                is_profitable, simulation_result = await self.trade_simulator.simulate_trade(opportunity)
-                                
-                                # Only add the opportunity if it's still profitable after simulation
-                                if is_profitable:
-                                    self.price_discrepancies.append(simulation_result)
-                                    logger.info(f"Found triangular opportunity on {dex_id} ({network_id}): "
-                                               f"{token_a} -> {token_b} -> {token_c} -> {token_a}, "
-                                               f"Net profit: {simulation_result['adjusted_net_profit_pct']:.2%}")
+                    # Simulate the trade
+                    is_profitable, simulation_result = await self.trade_simulator.simulate_trade(opportunity)
+                    
+                    # Only add the opportunity if it's still profitable after simulation
+                    if is_profitable:
+                        opportunities.append(simulation_result)
+                        logger.info("Found triangular opportunity on %s (%s): %s -> %s -> %s -> %s, Net profit: %.2f%%",
+                                    dex_id, network_id, token_a, token_b, token_c, token_a,
+                                    simulation_result["adjusted_net_profit_pct"] * 100)
+        
+        return opportunities
     
     def get_arbitrage_opportunities(self, min_profit: float = MIN_PROFIT_THRESHOLD, limit: int = 10):
         """Get the top arbitrage opportunities sorted by profit potential."""
         # Filter opportunities by minimum profit
-        filtered_opportunities = [
+        filtered_opportunities = (
             opp for opp in self.price_discrepancies
             if opp["adjusted_net_profit_pct"] >= min_profit
-        ]
-        
-        # Sort by net profit (descending)
-        sorted_opportunities = sorted(
-            filtered_opportunities,
-            key=lambda x: x["adjusted_net_profit_pct"],
-            reverse=True
         )
         
-        # Return the top opportunities
-        return sorted_opportunities[:limit]
+        # Return the top opportunities by net profit (descending) without a full sort
+        return heapq.nlargest(limit, filtered_opportunities, key=itemgetter("adjusted_net_profit_pct"))
 
 
 # Example usage
@@ -327,4 +761,8 @@ async def main():
         print(f"  Net Profit: {opp['adjusted_net_profit_pct']:.2%}")
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     asyncio.run(main())
\ No newline at end of file
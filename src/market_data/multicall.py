@@ -0,0 +1,160 @@
+"""
+Multicall3 batching for pool state reads in the DeFi Arbitrage Trading System.
+
+This module collapses the per-pool `getReserves()` / `slot0()` / `liquidity()`
+RPC calls of a market data refresh into one `aggregate3` eth_call per chain.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+logger = logging.getLogger("market_data.multicall")
+
+# Multicall3 is deployed at the same address on every supported network
+MULTICALL3_ADDRESS = Web3.to_checksum_address("0xcA11bde05977b3631167028862bE2a173976CA11")
+
+AGGREGATE3_SELECTOR = Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+GET_RESERVES_SELECTOR = Web3.keccak(text="getReserves()")[:4]
+SLOT0_SELECTOR = Web3.keccak(text="slot0()")[:4]
+LIQUIDITY_SELECTOR = Web3.keccak(text="liquidity()")[:4]
+
+
+class MulticallQuoteManager:
+    """
+    Batches pool state reads per chain through Multicall3's `aggregate3`.
+    """
+
+    def __init__(self, web3_clients: Dict[str, Any], batch_size: int = 500, timeout: float = 10.0):
+        """
+        Initialize the manager.
+
+        Args:
+            web3_clients: Async Web3 clients keyed by network ID.
+            batch_size: Maximum number of calls per aggregate3 eth_call.
+            timeout: Seconds a network's refresh may take before it is skipped.
+        """
+        self.web3_clients = web3_clients
+        self.batch_size = batch_size
+        self.timeout = timeout
+
+    async def share_session(self, session) -> bool:
+        """
+        Register an aiohttp session as the one web3 uses for every client's endpoint.
+
+        web3 caches one session per thread and endpoint URI for the whole process and
+        keeps the first one cached, so this has to run before any client at the same
+        endpoint makes a request.
+
+        Returns:
+            bool: False if another session was already cached for an endpoint and is
+                used for it instead.
+        """
+        shared = True
+        for network_id, web3 in self.web3_clients.items():
+            if await web3.provider.cache_async_session(session) is not session:
+                logger.warning("An RPC session was already cached for %s, the shared session is not used for it",
+                               network_id)
+                shared = False
+        return shared
+
+    async def aggregate3(self, network_id: str, calls: List[Tuple[str, bytes]]) -> List[Tuple[bool, bytes]]:
+        """
+        Execute read-only calls on a network through Multicall3.
+
+        Args:
+            network_id: The network to call.
+            calls: (target address, calldata) pairs. Every call is allowed to fail.
+
+        Returns:
+            List[Tuple[bool, bytes]]: A (success, returnData) pair per call, in order.
+        """
+        web3 = self.web3_clients[network_id]
+        results = []
+
+        for start in range(0, len(calls), self.batch_size):
+            batch = [
+                (Web3.to_checksum_address(target), True, calldata)
+                for target, calldata in calls[start:start + self.batch_size]
+            ]
+            data = AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [batch])
+            raw = await web3.eth.call({"to": MULTICALL3_ADDRESS, "data": data})
+            results.extend(decode(["(bool,bytes)[]"], bytes(raw))[0])
+
+        return results
+
+    async def refresh_pools(self, pools_by_network: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        Refresh reserves (V2) or price and liquidity (V3) for pools on every network.
+
+        Args:
+            pools_by_network: Pool dicts keyed by network ID. Pools with
+                `"version": "v3"` are read via `slot0()`/`liquidity()`, all
+                others via `getReserves()`.
+
+        Returns:
+            Dict[str, List[Dict]]: The refreshed pools per network. Pools whose
+                calls failed are dropped from the snapshot, as are networks that
+                failed or did not answer within the timeout.
+        """
+        network_ids = [n for n in pools_by_network if n in self.web3_clients]
+        # Each network is bounded by its own timeout so one slow RPC cannot stall the others
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(self._refresh_network(n, pools_by_network[n]), self.timeout)
+                for n in network_ids
+            ),
+            return_exceptions=True
+        )
+
+        refreshed = {}
+        for network_id, result in zip(network_ids, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.error("Multicall refresh timed out on %s after %ss", network_id, self.timeout)
+                continue
+            if isinstance(result, Exception):
+                logger.error("Multicall refresh failed on %s: %s", network_id, result)
+                continue
+            refreshed[network_id] = result
+        return refreshed
+
+    async def _refresh_network(self, network_id: str, pools: List[Dict]) -> List[Dict]:
+        """Refresh the pools of a single network with one batched Multicall3 read."""
+        calls = []
+        for pool in pools:
+            if pool.get("version") == "v3":
+                calls.append((pool["id"], SLOT0_SELECTOR))
+                calls.append((pool["id"], LIQUIDITY_SELECTOR))
+            else:
+                calls.append((pool["id"], GET_RESERVES_SELECTOR))
+
+        results = await self.aggregate3(network_id, calls)
+
+        refreshed = []
+        position = 0
+        for pool in pools:
+            if pool.get("version") == "v3":
+                (slot0_ok, slot0_data), (liquidity_ok, liquidity_data) = results[position:position + 2]
+                position += 2
+                if not (slot0_ok and liquidity_ok):
+                    continue
+                sqrt_price_x96 = decode(["uint160", "int24"], slot0_data[:64])[0]
+                pool["sqrtPriceX96"] = sqrt_price_x96
+                pool["liquidity"] = decode(["uint128"], liquidity_data)[0]
+            else:
+                success, data = results[position]
+                position += 1
+                if not success:
+                    continue
+                reserve0, reserve1, _ = decode(["uint112", "uint112", "uint32"], data)
+                pool["reserve0"] = reserve0 / 10 ** pool["token0"].get("decimals", 18)
+                pool["reserve1"] = reserve1 / 10 ** pool["token1"].get("decimals", 18)
+            refreshed.append(pool)
+
+        dropped = len(pools) - len(refreshed)
+        if dropped:
+            logger.warning("Dropped %d pools with failed reads on %s", dropped, network_id)
+        return refreshed
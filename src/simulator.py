@@ -7,7 +7,7 @@ profitable after all considerations.
 """
 
 import logging
-from typing import Dict, Tuple, Any
+from typing import Callable, Dict, List, Tuple, Any
 import asyncio
 
 from config.config import MIN_PROFIT_THRESHOLD
@@ -28,7 +28,16 @@ class TradeSimulator:
 
     def __init__(self):
         """Initialize the TradeSimulator."""
-        pass
+        self._profitable_callbacks: List[Callable[[Dict], Any]] = []
+
+    def on_profitable(self, callback: Callable[[Dict], Any]):
+        """
+        Register a callback invoked with every trade that is still profitable after simulation.
+
+        Args:
+            callback: Called with the revised trade data as soon as its simulation passes.
+        """
+        self._profitable_callbacks.append(callback)
 
     async def simulate_trade(self, trade_data: Dict) -> Tuple[bool, Dict[str, Any]]:
         """
@@ -108,6 +117,11 @@ class TradeSimulator:
             revised_trade_data = trade_data.copy()
             revised_trade_data["adjusted_net_profit_pct"] = adjusted_net_profit_pct
             logger.info(f"Trade is profitable after simulation. Net Profit: {adjusted_net_profit_pct:.2%}")
+            for callback in self._profitable_callbacks:
+                try:
+                    callback(revised_trade_data)
+                except Exception as e:
+                    logger.error("Profitable trade callback failed: %s", e)
             return True, revised_trade_data
         else:
             logger.warning(f"Trade is not profitable after simulation. Net Profit: {adjusted_net_profit_pct:.2%}")
@@ -1,7 +1,14 @@
 import pytest
 import asyncio
 from unittest.mock import AsyncMock, MagicMock
-from detector import ArbitrageDetector
+from detector import (
+    ArbitrageDetector,
+    BASE_RISK_CROSS_DEX,
+    LIQUIDITY_RISK_CROSS_DEX,
+    LIQUIDITY_RISK_TRIANGULAR,
+    PROFIT_RISK_CROSS_DEX,
+    _risk_score,
+)
 
 class DummyMarketDataService:
     def __init__(self):
@@ -42,4 +49,95 @@ async def test_validate_opportunities_empty():
     detector = ArbitrageDetector(MagicMock())
     detector.opportunities = []
     await detector.validate_opportunities()
-    assert detector.validated_opportunities == []
\ No newline at end of file
+    assert detector.validated_opportunities == []
+
+
+@pytest.mark.asyncio
+async def test_validated_opportunities_are_logged():
+    opportunity_logger = MagicMock()
+    detector = ArbitrageDetector(MagicMock(), opportunity_logger=opportunity_logger)
+    detector.opportunities = [{"type": "cross_dex", "net_profit_pct": 1.0, "token0": "WETH", "token1": "USDC"}]
+    detector._pool_keys = MagicMock(return_value=set())
+    detector._validation_cache_key = MagicMock(return_value=("buy", "sell"))
+    detector._get_token_price = MagicMock(return_value=1.0)
+    validated = {"type": "cross_dex", "expected_profit_usd": 12.5}
+    detector._validate_batch_cross_dex = MagicMock(return_value=[validated])
+
+    await detector.validate_opportunities()
+    opportunity_logger.log_opportunity.assert_called_once_with({
+        "opportunity_type": "cross_dex",
+        "details": validated,
+        "estimated_profit_usd": 12.5,
+    })
+
+    # The next cycle is served from the validation cache and isn't logged again
+    await detector.validate_opportunities()
+    assert len(detector.validated_opportunities) == 1
+    opportunity_logger.log_opportunity.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_start_detection_starts_and_stops_opportunity_logger():
+    opportunity_logger = MagicMock(stop=AsyncMock())
+    detector = ArbitrageDetector(MagicMock(), opportunity_logger=opportunity_logger)
+    detector.detect_opportunities = AsyncMock()
+
+    task = asyncio.create_task(detector.start_detection())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    opportunity_logger.start.assert_called_once()
+    opportunity_logger.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_validation_cache_hit_is_restamped():
+    detector = ArbitrageDetector(MagicMock())
+    opp = {"type": "cross_dex", "net_profit_pct": 1.0, "token0": "WETH", "token1": "USDC"}
+    detector.opportunities = [opp]
+    detector._pool_keys = MagicMock(return_value=set())
+    detector._validation_cache_key = MagicMock(return_value=("buy", "sell"))
+    detector._validate_batch_cross_dex = MagicMock(return_value=[{
+        **opp, "validation_timestamp": 100.0, "expected_profit_usd": 12.5,
+        "token0_price_usd": 2000.0, "token1_price_usd": 1.0,
+    }])
+    await detector.validate_opportunities(validation_timestamp=100.0)
+
+    detector._get_token_price = MagicMock(side_effect=lambda token: {"WETH": 2100.0, "USDC": 1.0}[token])
+    await detector.validate_opportunities(validation_timestamp=130.0)
+    # The second cycle is served from the cache
+    detector._validate_batch_cross_dex.assert_called_with([], 130.0)
+    [validated] = detector.validated_opportunities
+    assert validated["validation_timestamp"] == 130.0
+    assert validated["token0_price_usd"] == 2100.0
+    assert validated["expected_profit_usd"] == 12.5
+
+
+@pytest.mark.parametrize("min_liquidity, cross_dex_risk, triangular_risk", [
+    (0.0, 20.0, 25.0),
+    (99999.99, 20.0, 25.0),
+    (100000.0, 10.0, 15.0),
+    (499999.99, 10.0, 15.0),
+    (500000.0, 5.0, 8.0),
+    (999999.99, 5.0, 8.0),
+    (1000000.0, 0.0, 0.0),
+    (1e9, 0.0, 0.0),
+])
+
+
+def test_risk_score_liquidity_tier_boundaries(min_liquidity, cross_dex_risk, triangular_risk):
+    # Each tier bound belongs to the tier above it
+    assert _risk_score(0.0, 0.0, 0.0, min_liquidity, LIQUIDITY_RISK_CROSS_DEX, 0.0) == cross_dex_risk
+    assert _risk_score(0.0, 0.0, 0.0, min_liquidity, LIQUIDITY_RISK_TRIANGULAR, 0.0) == triangular_risk
+
+
+def test_risk_score_is_capped():
+    def score(profit_pct, extra_risk):
+        return _risk_score(
+            BASE_RISK_CROSS_DEX, PROFIT_RISK_CROSS_DEX, profit_pct, 0.0, LIQUIDITY_RISK_CROSS_DEX, extra_risk
+        )
+
+    assert score(0.01, 15.0) == 50.0 + 10.0 + 20.0 + 15.0
+    assert score(0.5, 15.0) == 100.0
+    assert score(-1.0, 0.0) == 0.0
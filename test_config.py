@@ -0,0 +1,24 @@
+import dataclasses
+
+import pytest
+from config import ENABLED_NETWORKS, NETWORKS, NetworkConfig
+
+
+def test_networks_are_parsed_into_network_configs():
+    assert NETWORKS["polygon"].chain_id == 137
+    assert all(isinstance(network, NetworkConfig) for network in NETWORKS.values())
+
+
+def test_enabled_networks_have_rpc_urls():
+    assert set(ENABLED_NETWORKS) <= set(NETWORKS)
+    assert all(network.enabled and network.rpc_url for network in ENABLED_NETWORKS.values())
+
+
+def test_network_settings_are_frozen():
+    with pytest.raises(TypeError):
+        NETWORKS["polygon"] = NETWORKS["base"]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        NETWORKS["polygon"].rpc_url = "http://localhost:8545"
+    # Slotted, so a typo can't add a new setting
+    with pytest.raises((AttributeError, TypeError)):
+        object.__setattr__(NETWORKS["polygon"], "rpc_uri", "http://localhost:8545")
@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import pytest
+from psycopg2.pool import PoolError
+
+from db_config import BatchedOpportunityLogger, bulk_log_opportunities
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, statement, buf):
+        self.conn.staged.append(buf.read())
+
+    def execute(self, statement, *args):
+        self.conn.merges += 1
+
+
+class FakeConnection:
+    def __init__(self):
+        self.staged = []
+        self.merges = 0
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    """Hands out a single connection, failing the first `failures` checkouts."""
+
+    def __init__(self, failures=0):
+        self.conn = FakeConnection()
+        self.failures = failures
+        self.checked_out = 0
+
+    def getconn(self):
+        if self.failures:
+            self.failures -= 1
+            raise PoolError("connection pool exhausted")
+        self.checked_out += 1
+        return self.conn
+
+    def putconn(self, conn, close=False):
+        self.checked_out -= 1
+
+
+def test_bulk_log_opportunities_copies_csv_rows():
+    conn = FakeConnection()
+    assert bulk_log_opportunities(conn, [
+        {"opportunity_type": "cross_dex", "details": {"pair": "WETH/USDC"}, "estimated_profit_usd": 12.5},
+        {"opportunity_type": "triangular", "status": "simulated"},
+    ])
+    assert conn.staged == ['cross_dex,"{""pair"":""WETH/USDC""}",12.5,detected\r\ntriangular,{},,simulated\r\n']
+    assert conn.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_batched_logger_flushes_and_merges_on_stop():
+    pool = FakePool()
+    opportunity_logger = BatchedOpportunityLogger(pool, flush_interval=0.01, merge_interval=60)
+    opportunity_logger.start()
+    for i in range(3):
+        opportunity_logger.log_opportunity({"opportunity_type": "cross_dex", "details": {"i": i}})
+    await asyncio.sleep(0.05)
+    opportunity_logger.log_opportunity({"opportunity_type": "triangular"})
+    await opportunity_logger.stop()
+
+    assert [chunk.count("\r\n") for chunk in pool.conn.staged] == [3, 1]
+    assert pool.conn.merges == 1
+    assert pool.checked_out == 0
+
+
+@pytest.mark.asyncio
+async def test_batched_logger_retries_a_failed_batch():
+    pool = FakePool(failures=1)
+    opportunity_logger = BatchedOpportunityLogger(pool, flush_interval=0.01, merge_interval=60)
+    opportunity_logger.start()
+    opportunity_logger.log_opportunity({"opportunity_type": "cross_dex"})
+    await asyncio.sleep(0.1)
+
+    # The first flush could not check out a connection, the batch went out on the retry
+    assert not opportunity_logger._task.done()
+    assert pool.conn.staged == ["cross_dex,{},,detected\r\n"]
+    await opportunity_logger.stop()
+    assert pool.conn.staged == ["cross_dex,{},,detected\r\n"]
+
+
+class SlowConnection(FakeConnection):
+    def cursor(self):
+        cursor = FakeCursor(self)
+        copy_expert = cursor.copy_expert
+
+        def slow_copy(statement, buf):
+            time.sleep(0.1)
+            copy_expert(statement, buf)
+
+        cursor.copy_expert = slow_copy
+        return cursor
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_an_in_flight_flush():
+    pool = FakePool()
+    pool.conn = SlowConnection()
+    opportunity_logger = BatchedOpportunityLogger(pool, flush_interval=0.01, merge_interval=60)
+    opportunity_logger.start()
+    opportunity_logger.log_opportunity({"opportunity_type": "cross_dex"})
+    await asyncio.sleep(0.05)
+
+    # The COPY is running on a worker thread, stopping now must not write its rows twice
+    await opportunity_logger.stop()
+    assert pool.conn.staged == ["cross_dex,{},,detected\r\n"]
+
+
+@pytest.mark.asyncio
+async def test_backlog_stays_bounded_while_flushes_fail():
+    opportunity_logger = BatchedOpportunityLogger(
+        FakePool(failures=10**6), flush_every=10, flush_interval=0.01, merge_interval=60, max_pending=50
+    )
+    opportunity_logger.start()
+    for i in range(1000):
+        opportunity_logger.log_opportunity({"opportunity_type": "cross_dex", "details": {"i": i}})
+        if i % 100 == 0:
+            await asyncio.sleep(0.02)
+
+    assert len(opportunity_logger._pending) <= 10
+    assert opportunity_logger._queue.qsize() <= 50
+    # The oldest queued rows were dropped, the newest kept
+    queued = [opportunity_logger._queue.get_nowait() for _ in range(opportunity_logger._queue.qsize())]
+    assert queued[-1][1] == '{"i":999}'
+    await opportunity_logger.stop()
@@ -1,6 +1,10 @@
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+import aiohttp
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
 from executor import FlashloanExecutor
+from src.market_data.multicall import MulticallQuoteManager
 from src.trade_simulation import TradeSimulationService
 
 @pytest.fixture
@@ -34,4 +38,160 @@ async def test_execute_real_aave_flashloan(flashloan_executor):
     execution_result = await flashloan_executor.execute_real_aave_flashloan(trade, {})
     assert execution_result["success"] is True
     assert "gas_used" in execution_result
-    assert "profit_usd" in execution_result
\ No newline at end of file
+    assert "profit_usd" in execution_result
+
+
+@pytest.mark.asyncio
+async def test_refresh_prices_rate_limits_eth_price(flashloan_executor):
+    for client in flashloan_executor.web3_clients.values():
+        type(client.eth).gas_price = PropertyMock(side_effect=lambda: asyncio.sleep(0, 30_000_000_000))
+    response = MagicMock()
+    response.json = AsyncMock(return_value={"ethereum": {"usd": 2500.0}})
+    session = MagicMock(closed=False)
+    session.get.return_value.__aenter__.return_value = response
+    flashloan_executor._session = session
+    flashloan_executor.price_refresh_interval = 0.01
+    flashloan_executor.eth_price_refresh_interval = 60
+
+    task = asyncio.create_task(flashloan_executor._refresh_prices())
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # Gas prices follow every cycle, the ETH price is only requested once per its own interval
+    assert flashloan_executor._gas_cache == {"1": 30_000_000_000, "2": 30_000_000_000}
+    assert flashloan_executor._eth_price == 2500.0
+    session.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_start_execution_runs_submitted_trades_without_polling(flashloan_executor, mock_simulation_service):
+    flashloan_executor._ensure_session = AsyncMock()
+    flashloan_executor._price_task = MagicMock()
+    flashloan_executor.execute_trade = AsyncMock()
+
+    task = asyncio.create_task(flashloan_executor.start_execution())
+    assert flashloan_executor.submit({"id": "trade-1", "type": "cross_dex"})
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    flashloan_executor.execute_trade.assert_awaited_once_with({"id": "trade-1", "type": "cross_dex"})
+    mock_simulation_service.get_profitable_simulations.assert_not_called()
+
+FLASHLOAN_ABI = [{
+    "name": "flashLoan",
+    "type": "function",
+    "stateMutability": "nonpayable",
+    "inputs": [
+        {"name": "receiverAddress", "type": "address"},
+        {"name": "assets", "type": "address[]"},
+        {"name": "amounts", "type": "uint256[]"},
+        {"name": "modes", "type": "uint256[]"},
+        {"name": "onBehalfOf", "type": "address"},
+        {"name": "params", "type": "bytes"},
+        {"name": "referralCode", "type": "uint16"},
+    ],
+    "outputs": [],
+}]
+
+
+@pytest.mark.parametrize("amount", [0, 1, 10**21, 2**256 - 1])
+def test_flashloan_calldata_matches_encode_abi(flashloan_executor, amount):
+    wallet = "0x000000000000000000000000000000000000dEaD"
+    asset = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+    flashloan_executor.wallet_address = wallet
+    lending_pool = Web3().eth.contract(abi=FLASHLOAN_ABI)
+
+    # The first call builds the template, the second patches a cached one
+    flashloan_executor._flashloan_calldata("polygon", asset, 12345)
+    calldata = flashloan_executor._flashloan_calldata("polygon", asset, amount)
+
+    expected = lending_pool.encodeABI(
+        fn_name="flashLoan", args=[wallet, [asset], [amount], [0], wallet, b"", 0]
+    )
+    assert "0x" + calldata.hex() == expected
+
+
+@pytest.mark.asyncio
+async def test_execution_callbacks_receive_every_result(flashloan_executor):
+    flashloan_executor.select_flashloan_provider = AsyncMock(return_value=("aave", {"fee": 0.0009}))
+    results = []
+    flashloan_executor.on_execution_complete(results.append)
+    triangular = {
+        "id": "tri-1", "type": "triangular", "token_a": "WETH", "token_b": "USDC", "token_c": "WMATIC",
+        "dex_id": "quickswap", "network_id": "1", "simulated_profit_usd": 50,
+    }
+
+    await flashloan_executor.execute_trade(triangular)
+    await flashloan_executor.execute_trade({"id": "bad-1", "type": "unknown"})
+
+    assert [(result["id"], result["status"]) for result in results] == [("tri-1", "success"), ("bad-1", "failed")]
+    assert results[0]["profit_usd"] > 0
+    assert results[0]["flashloan_fee"] == pytest.approx(0.9)
+
+
+def _batch_session(response_items):
+    response = MagicMock()
+    response.json = AsyncMock(return_value=response_items)
+    session = MagicMock(closed=False)
+    session.post.return_value.__aenter__.return_value = response
+    return session
+
+
+@pytest.mark.asyncio
+async def test_rpc_batch_returns_results_in_call_order(flashloan_executor):
+    # Providers may answer a batch in any order, results are matched back by request ID
+    flashloan_executor._session = _batch_session([
+        {"jsonrpc": "2.0", "id": 1, "result": "0x3b9aca00"},
+        {"jsonrpc": "2.0", "id": 0, "result": "0x5"},
+    ])
+    web3 = MagicMock()
+    web3.provider.endpoint_uri = "http://rpc"
+
+    results = await flashloan_executor._rpc_batch(
+        web3, [("eth_getTransactionCount", ["0xMockWalletAddress", "pending"]), ("eth_gasPrice", [])]
+    )
+    assert results == ["0x5", "0x3b9aca00"]
+    payload = flashloan_executor._session.post.call_args.kwargs["json"]
+    assert [(item["id"], item["method"]) for item in payload] == [(0, "eth_getTransactionCount"), (1, "eth_gasPrice")]
+
+
+@pytest.mark.asyncio
+async def test_rpc_batch_raises_on_error(flashloan_executor):
+    flashloan_executor._session = _batch_session([
+        {"jsonrpc": "2.0", "id": 0, "error": {"code": -32000, "message": "header not found"}},
+    ])
+    with pytest.raises(ValueError, match="eth_chainId failed"):
+        await flashloan_executor._rpc_batch(MagicMock(), [("eth_chainId", [])])
+
+
+@pytest.mark.asyncio
+async def test_open_session_is_shared_with_other_clients(mock_simulation_service):
+    uri = "http://shared-session.test:8545"
+    executor = FlashloanExecutor(mock_simulation_service)
+    executor.multicall.web3_clients = {"polygon": AsyncWeb3(AsyncHTTPProvider(uri))}
+    session = await executor.open_session()
+    other = aiohttp.ClientSession()
+    try:
+        # A later client at the same endpoint gets the executor's tuned session, not its own
+        assert await AsyncHTTPProvider(uri).cache_async_session(other) is session
+    finally:
+        await other.close()
+        await executor.close()
+
+
+@pytest.mark.asyncio
+async def test_share_session_warns_when_another_session_is_cached(caplog):
+    uri = "http://already-cached.test:8545"
+    first, shared = aiohttp.ClientSession(), aiohttp.ClientSession()
+    try:
+        await AsyncHTTPProvider(uri).cache_async_session(first)
+        manager = MulticallQuoteManager({"polygon": AsyncWeb3(AsyncHTTPProvider(uri))})
+        assert not await manager.share_session(shared)
+        assert "already cached for polygon" in caplog.text
+    finally:
+        await first.close()
+        await shared.close()
@@ -0,0 +1,82 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+from src.analyzer import (
+    build_log_graph,
+    build_pool_soa,
+    find_profitable_triangles,
+)
+
+
+def _pool(pool_id, token0, token1, reserve0, reserve1, fee=0.003):
+    return {
+        "id": pool_id,
+        "token0": {"symbol": token0},
+        "token1": {"symbol": token1},
+        "reserve0": reserve0,
+        "reserve1": reserve1,
+        "feeTier": fee,
+    }
+
+
+@pytest.fixture
+def pools():
+    # A -> B -> C -> A is mispriced by ~10%, D only links to A and B
+    return {
+        "uniswap_polygon": [
+            _pool("ab", "A", "B", 1000.0, 1000.0),
+            _pool("bc", "B", "C", 1000.0, 2000.0),
+            _pool("ca", "C", "A", 2000.0, 1100.0),
+            _pool("ad", "A", "D", 500.0, 1500.0),
+            _pool("db", "D", "B", 1500.0, 480.0),
+        ]
+    }
+
+
+def test_build_log_graph_weights(pools):
+    soa = build_pool_soa(pools)
+    tokens, edges, edge_info = build_log_graph(soa, np.arange(len(soa["pool_id"])))
+    assert tokens == ["A", "B", "C", "D"]
+    assert len(edges) == 2 * len(soa["pool_id"])
+    for (src, dst, weight), info in zip(edges, edge_info):
+        assert weight == pytest.approx(-math.log(info.price * (1 - info.fee)))
+
+
+def _nested_loop_triangles(pools, min_profit, gas_cost_pct):
+    """Reference: the original dict-of-dicts triple loop over every token triple."""
+    graph = {}
+    for pool in pools:
+        a, b = pool["token0"]["symbol"], pool["token1"]["symbol"]
+        price = pool["reserve1"] / pool["reserve0"]
+        graph.setdefault(a, {})[b] = (price, pool["feeTier"])
+        graph.setdefault(b, {})[a] = (1 / price, pool["feeTier"])
+
+    found = set()
+    for a, b, c in itertools.permutations(graph, 3):
+        if b not in graph[a] or c not in graph[b] or a not in graph[c]:
+            continue
+        (p_ab, f_ab), (p_bc, f_bc), (p_ca, f_ca) = graph[a][b], graph[b][c], graph[c][a]
+        net_profit = p_ab * p_bc * p_ca - 1 - (f_ab + f_bc + f_ca) - gas_cost_pct
+        if net_profit >= min_profit:
+            # Report each cycle once, rotated to start at its smallest token
+            start = min(range(3), key=lambda i: (a, b, c)[i])
+            found.add(((a, b, c) * 2)[start:start + 3])
+    return found
+
+
+@pytest.mark.parametrize("min_profit", [0.0, 0.005, 0.05, 0.5])
+def test_triangle_scan_matches_nested_loop(pools, min_profit):
+    gas_cost_pct = 0.002
+    soa = build_pool_soa(pools)
+    tokens, edges, edge_info = build_log_graph(soa, np.arange(len(soa["pool_id"])))
+
+    cycles = find_profitable_triangles(len(tokens), edges, edge_info, min_profit, gas_cost_pct)
+    found = set()
+    for cycle in cycles:
+        path = tuple(tokens[int(edges[e, 0])] for e in cycle)
+        start = path.index(min(path))
+        found.add((path * 2)[start:start + 3])
+
+    assert found == _nested_loop_triangles(pools["uniswap_polygon"], min_profit, gas_cost_pct)
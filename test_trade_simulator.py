@@ -1,6 +1,7 @@
 import pytest
 import asyncio
 from src.market_data.collector import TradeSimulator
+from src.simulator import TradeSimulator as PushingTradeSimulator
 
 @pytest.mark.asyncio
 async def test_simulate_trade_cross_dex():
@@ -51,4 +52,25 @@ async def test_simulate_trade_unknown_type():
     trade_data = {"type": "unknown"}
     profitable, details = await simulator.simulate_trade(trade_data)
     assert profitable is False
-    assert "reason" in details
\ No newline at end of file
+    assert "reason" in details
+
+
+@pytest.mark.asyncio
+async def test_profitable_trades_are_pushed_to_callbacks():
+    simulator = PushingTradeSimulator()
+    pushed = []
+    simulator.on_profitable(pushed.append)
+    trade_data = {
+        "type": "cross_dex",
+        "buy_price": 2000,
+        "sell_price": 2100,
+        "buy_fee": 0.003,
+        "sell_fee": 0.003,
+    }
+    profitable, details = await simulator.simulate_trade(trade_data)
+    assert profitable
+    assert pushed == [details]
+
+    # Unprofitable trades are not pushed
+    await simulator.simulate_trade({**trade_data, "sell_price": 2000})
+    assert pushed == [details]